@@ -1,14 +1,73 @@
+import time
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.optimize import minimize
+from scipy.optimize import minimize, differential_evolution, OptimizeResult
 from qiskit import QuantumCircuit
+from qiskit.circuit import Parameter, ParameterExpression
 from qiskit.quantum_info import SparsePauliOp
 from qiskit.primitives import StatevectorEstimator as Estimator, Sampler
 from qiskit.circuit.library import EfficientSU2, RealAmplitudes, TwoLocal
 from qiskit_ibm_runtime import SamplerV2, EstimatorV2
-from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
 from qiskit_aer.primitives import Estimator as AerEstimator
 from nftopt import nakanishi_fujii_todo
+from QUBO_statevector import DiagonalStatevectorEngine
+from QUBO_transpile import TranspileCache, default_transpile_cache
+from QUBO_checkpoint import save_checkpoint, load_checkpoint
+
+
+# scipy methods that accept a user-supplied gradient
+GRADIENT_METHODS = ["BFGS", "L-BFGS-B", "SLSQP", "CG", "TNC", "NEWTON-CG", "TRUST-CONSTR"]
+
+# Single-parameter gates with Pauli generators, for which the two-term
+# parameter-shift rule is exact
+SHIFT_RULE_GATES = ["rx", "ry", "rz", "p"]
+
+# scipy methods whose maxiter limits cost evaluations rather than iterations
+EVALUATION_BUDGET_METHODS = ["COBYLA"]
+
+
+class OptimizationStopped(Exception):
+    """Raised inside the cost function to end an optimization early."""
+
+
+# Cancellation event of the current multi-start worker process
+_multistart_stop_event = None
+
+
+def _init_multistart_worker(stop_event):
+    """Share the cancellation event with a multi-start worker process."""
+    global _multistart_stop_event
+    _multistart_stop_event = stop_event
+
+
+def _multistart_worker(hamiltonian, ansatz, estimator, engine, x0, maxiter, optimizer,
+                       callback_step_size, target_energy, batched, gradient):
+    """
+    Run one multi-start restart in a worker process.
+    
+    Returns:
+        Tuple of (parameters, energy, cost_history); all None when the restart
+        was skipped because another one already met the stop condition
+    """
+    solver = VQESolver(hamiltonian)
+    # The ansatz is already decomposed; set it directly to keep it unchanged
+    solver._ansatz = ansatz
+    solver.set_estimator(estimator)
+    solver.set_engine(engine)
+    solver.set_stop_condition(target_energy, _multistart_stop_event)
+    
+    if _multistart_stop_event.is_set():
+        return None, None, None
+    
+    parameters = solver.solve(maxiter, optimizer, x0=x0,
+                              callback_step_size=callback_step_size,
+                              batched=batched, gradient=gradient)
+    energy = solver.run_estimator([parameters])[0]
+    return parameters, energy, solver.callback_dict["cost_history"]
 
 
 class VQESolver:
@@ -37,9 +96,15 @@ class VQESolver:
         self._estimator = Estimator()
         self._sampler = Sampler()
         
+        # Expectation engine: 'estimator' (Qiskit primitive) or 'numpy'
+        self._engine = "estimator"
+        self._numpy_engine = None
+        
         # For IBM runtime support
         self._ansatz_isa = None
         self._hamiltonian_isa = None
+        self._transpile_cache = default_transpile_cache
+        self._optimization_level = 3
         
         # Optimization tracking
         self._callback_dict = {
@@ -50,6 +115,34 @@ class VQESolver:
         self._last_parameters = None
         self._last_sampler_stats = None
         
+        # Best evaluation of the current solve and early-stopping criteria
+        self._best_cost = None
+        self._best_parameters = None
+        self._target_energy = None
+        self._stop_event = None
+        self._optimizing = False
+        
+        # Warm starts from previously solved, related Hamiltonians
+        self._warm_start_store = None
+        self._warm_start_max_distance = None
+        
+        # Adaptive precision and shot accounting
+        self._shot_schedule = None
+        
+        # Optional PerformanceTrace of evaluations, transpilation and sampling
+        self._trace = None
+        
+        # Periodic checkpoints of the running solve
+        self._checkpoint_path = None
+        self._checkpoint_every = 50
+        self._solve_settings = None
+        self._optimizer_state = None
+        self._evaluations = 0
+        self._last_checkpoint = 0
+        # Budget spent, in the unit the optimizer's maxiter limits
+        self._progress = 0
+        self._count_evaluations = False
+        
     # Properties
     @property
     def hamiltonian(self):
@@ -71,6 +164,18 @@ class VQESolver:
     def sampler(self):
         return self._sampler
     
+    @property
+    def transpile_cache(self):
+        return self._transpile_cache
+    
+    @property
+    def trace(self):
+        return self._trace
+    
+    @property
+    def engine(self):
+        return self._engine
+    
     @property
     def callback_dict(self):
         return self._callback_dict
@@ -79,6 +184,10 @@ class VQESolver:
     def last_parameters(self):
         return self._last_parameters
     
+    @property
+    def best_cost(self):
+        return self._best_cost
+    
     # Setters
     def set_hamiltonian(self, hamiltonian):
         """
@@ -92,6 +201,7 @@ class VQESolver:
             self._num_qubits = hamiltonian.num_qubits
         self._ansatz_isa = None
         self._hamiltonian_isa = None
+        self._numpy_engine = None
     
     def set_num_qubits(self, num_qubits):
         """Set the number of qubits."""
@@ -117,6 +227,108 @@ class VQESolver:
         """
         self._sampler = sampler
     
+    def set_transpile_cache(self, cache=None, cache_dir=None, optimization_level=3):
+        """
+        Configure the cache of transpiled ISA circuits.
+        
+        Args:
+            cache: TranspileCache to use (shared default cache if None)
+            cache_dir: Directory for a new on-disk cache (ignored if cache is given)
+            optimization_level: Preset pass manager optimization level
+        """
+        if cache is None:
+            cache = default_transpile_cache if cache_dir is None else TranspileCache(cache_dir)
+        self._transpile_cache = cache
+        self._optimization_level = optimization_level
+        self._ansatz_isa = None
+        self._hamiltonian_isa = None
+    
+    def set_warm_start_store(self, store, max_distance=None):
+        """
+        Warm-start solves from a store of previously optimized parameters.
+        
+        When solve() is called without x0, the parameters of the nearest stored
+        Hamiltonian are used, and every finished solve is recorded in the store.
+        
+        Args:
+            store: WarmStartStore (None disables warm starts)
+            max_distance: Maximum relative coefficient distance to accept
+        """
+        self._warm_start_store = store
+        self._warm_start_max_distance = max_distance
+    
+    def set_shot_schedule(self, schedule):
+        """
+        Use an adaptive precision schedule for estimator evaluations.
+        
+        The schedule's precision is passed to V2 estimators (shots to the Aer
+        estimator), starts loose and tightens as cost improvements shrink. Its
+        shot budget ends the optimization once exhausted. Only estimator
+        evaluations are scheduled: sample_circuit() runs with its own shots,
+        which are counted against the budget but not changed.
+        
+        Args:
+            schedule: ShotSchedule (None restores the estimator defaults)
+        """
+        self._shot_schedule = schedule
+    
+    def shot_report(self):
+        """Return the shot accounting of the current schedule (None if unset)."""
+        if self._shot_schedule is None:
+            return None
+        return self._shot_schedule.report()
+    
+    def set_trace(self, trace):
+        """
+        Record a structured performance trace of every solve.
+        
+        Args:
+            trace: PerformanceTrace (None disables tracing)
+        """
+        self._trace = trace
+    
+    def set_checkpoint(self, path, every=50):
+        """
+        Periodically checkpoint solves so they can be continued with resume().
+        
+        The checkpoint holds the solve settings, best parameters, cost history,
+        shot accounting, the ansatz and ISA circuit, and the optimizer state
+        for batched NFT and differential evolution.
+        
+        Args:
+            path: Checkpoint file (None disables checkpointing)
+            every: Number of cost evaluations between checkpoints
+        """
+        self._checkpoint_path = path
+        self._checkpoint_every = every
+    
+    def set_stop_condition(self, target_energy=None, stop_event=None):
+        """
+        Stop optimizations early.
+        
+        Args:
+            target_energy: Stop once a cost at or below this value is evaluated
+            stop_event: threading/multiprocessing Event; the optimization stops
+                        when it is set, and it is set when the target is reached
+        """
+        self._target_energy = target_energy
+        self._stop_event = stop_event
+    
+    def set_engine(self, engine: str):
+        """
+        Select how expectation values are computed.
+        
+        Args:
+            engine: 'estimator' to use the configured Qiskit estimator, or
+                    'numpy' for the local state-vector engine for diagonal
+                    (QUBO/Ising) Hamiltonians
+        """
+        engine = engine.lower()
+        if engine not in ["estimator", "numpy"]:
+            raise ValueError(f"Unsupported engine: {engine}. Use 'estimator' or 'numpy'")
+        self._engine = engine
+        self._numpy_engine = None
+    
     def set_ansatz_type(self, ansatz_type: str, reps: int = 3, initial_state=None):
         """
         Create an ansatz from predefined types.
@@ -151,6 +363,7 @@ class VQESolver:
             self._ansatz = temp_ansatz
         
         self._ansatz_isa = None
+        self._numpy_engine = None
     
     def set_custom_ansatz(self, ansatz):
         """
@@ -163,6 +376,7 @@ class VQESolver:
         if self._num_qubits is None:
             self._num_qubits = ansatz.num_qubits
         self._ansatz_isa = None
+        self._numpy_engine = None
     
     def check_num_parameters(self):
         """Return the number of parameters in the ansatz."""
@@ -170,6 +384,150 @@ class VQESolver:
             raise ValueError("Ansatz not set")
         return self._ansatz.num_parameters
     
+    def _prepare_isa(self):
+        """Transpile the ansatz and map the Hamiltonian for IBM runtime estimators."""
+        if self._engine == "estimator" and isinstance(self._estimator, EstimatorV2):
+            if self._ansatz_isa is None:
+                backend = self._estimator.__getattribute__("_backend")
+                start = time.perf_counter()
+                self._ansatz_isa = self._transpile_cache.transpile(
+                    self._ansatz, backend, self._optimization_level
+                )
+                if self._trace is not None:
+                    self._trace.record_event("transpile", time.perf_counter() - start,
+                                             circuit="ansatz")
+                self._hamiltonian_isa = self._hamiltonian.apply_layout(
+                    self._ansatz_isa.layout
+                )
+    
+    def _check_param_matrix(self, param_matrix):
+        """Validate the problem setup and return parameters as a 2D array."""
+        if self._hamiltonian is None:
+            raise ValueError("Hamiltonian not set")
+        if self._ansatz is None:
+            raise ValueError("Ansatz not set")
+        
+        param_matrix = np.atleast_2d(np.asarray(param_matrix, dtype=float))
+        if param_matrix.shape[1] != self._ansatz.num_parameters:
+            raise ValueError(f"Each parameter set must have "
+                             f"{self._ansatz.num_parameters} parameters")
+        return param_matrix
+    
+    def submit_estimator(self, param_matrix):
+        """
+        Submit one estimator job for a batch of parameter sets without waiting.
+        
+        Args:
+            param_matrix: Array of shape (batch, num_parameters)
+            
+        Returns:
+            Estimator job; pass its result to estimator_values
+        """
+        param_matrix = self._check_param_matrix(param_matrix)
+        
+        # Precision requested by the adaptive schedule
+        run_options = {}
+        if self._shot_schedule is not None:
+            self._shot_schedule.record(len(param_matrix))
+            if isinstance(self._estimator, AerEstimator):
+                run_options["shots"] = self._shot_schedule.shots
+            else:
+                run_options["precision"] = self._shot_schedule.precision
+        
+        # Run estimation
+        if isinstance(self._estimator, AerEstimator):
+            batch = len(param_matrix)
+            return self._estimator.run(
+                circuits=[self._ansatz] * batch,
+                observables=[self._hamiltonian] * batch,
+                parameter_values=param_matrix.tolist(),
+                **run_options
+            )
+        
+        # One PUB: the single observable broadcasts against every parameter row
+        if self._ansatz_isa is None:
+            pub = (self._ansatz, [self._hamiltonian], param_matrix)
+        else:
+            pub = (self._ansatz_isa, [self._hamiltonian_isa], param_matrix)
+        return self._estimator.run(pubs=[pub], **run_options)
+    
+    def estimator_values(self, result):
+        """Extract the expectation values from an estimator job result."""
+        if isinstance(self._estimator, AerEstimator):
+            return np.asarray(result.values, dtype=float)
+        return np.asarray(result[0].data.evs, dtype=float).reshape(-1)
+    
+    def run_estimator(self, param_matrix):
+        """
+        Evaluate the Hamiltonian expectation for a batch of parameter sets
+        with a single estimator job.
+        
+        Args:
+            param_matrix: Array of shape (batch, num_parameters)
+            
+        Returns:
+            numpy array of expectation values, one per row of param_matrix
+        """
+        if self._engine == "numpy":
+            param_matrix = self._check_param_matrix(param_matrix)
+            if self._numpy_engine is None:
+                self._numpy_engine = DiagonalStatevectorEngine(self._ansatz, self._hamiltonian)
+            return self._numpy_engine.energies(param_matrix)
+        
+        job = self.submit_estimator(param_matrix)
+        return self.estimator_values(job.result())
+    
+    def _executed_circuit(self):
+        """Circuit actually run by the estimator (the ISA circuit if transpiled)."""
+        if self._engine == "estimator" and self._ansatz_isa is not None:
+            return self._ansatz_isa
+        return self._ansatz
+    
+    def record_costs(self, costs, param_matrix, latency=None):
+        """
+        Update callback tracking and the best evaluation with one or more costs,
+        and stop the optimization if a stop condition is met.
+        
+        Args:
+            costs: Evaluated costs
+            param_matrix: Parameter sets the costs were evaluated at
+            latency: Seconds spent in the estimator, for the performance trace
+        """
+        if self._trace is not None and latency is not None:
+            self._trace.record_evaluation(costs, param_matrix, latency,
+                                          self._executed_circuit())
+        
+        if self._callback_step_size != 0:
+            for cost in costs:
+                self._callback_dict["iters"] += 1
+                if self._callback_dict["iters"] % self._callback_step_size == 0:
+                    self._callback_dict["cost_history"].append(cost)
+        
+        if self._shot_schedule is not None:
+            self._shot_schedule.update(costs)
+        
+        best = int(np.argmin(costs))
+        if self._best_cost is None or costs[best] < self._best_cost:
+            self._best_cost = costs[best]
+            self._best_parameters = np.array(param_matrix[best], dtype=float)
+        
+        if not self._optimizing:
+            return
+        self._evaluations += len(costs)
+        if self._count_evaluations:
+            self._progress += len(costs)
+        if (self._checkpoint_path is not None
+                and self._evaluations - self._last_checkpoint >= self._checkpoint_every):
+            self.save_checkpoint()
+        if self._target_energy is not None and self._best_cost <= self._target_energy:
+            if self._stop_event is not None:
+                self._stop_event.set()
+            raise OptimizationStopped("Target energy reached")
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise OptimizationStopped("Stop event set")
+        if self._shot_schedule is not None and self._shot_schedule.exhausted():
+            raise OptimizationStopped("Shot budget exhausted")
+    
     def cost_func(self, params):
         """
         Cost function for VQE optimization.
@@ -180,38 +538,165 @@ class VQESolver:
         Returns:
             Expectation value of the Hamiltonian
         """
-        if self._hamiltonian is None:
-            raise ValueError("Hamiltonian not set")
+        start = time.perf_counter()
+        cost = self.run_estimator([params])[0]
+        self.record_costs([cost], [params], time.perf_counter() - start)
+        return cost
+    
+    def cost_func_batch(self, param_matrix):
+        """
+        Batched cost function: evaluates many parameter sets in one estimator job.
+        
+        Args:
+            param_matrix: Array of shape (batch, num_parameters)
+            
+        Returns:
+            numpy array with the expectation value of each parameter set
+        """
+        start = time.perf_counter()
+        costs = self.run_estimator(param_matrix)
+        self.record_costs(costs, np.atleast_2d(param_matrix), time.perf_counter() - start)
+        return costs
+    
+    def _finite_difference_jac(self, params, step=1e-3):
+        """
+        Forward-difference gradient with the whole stencil in a single batch.
+        
+        Args:
+            params: Point at which to evaluate the gradient
+            step: Finite-difference step size
+            
+        Returns:
+            Gradient vector
+        """
+        params = np.asarray(params, dtype=float)
+        stencil = np.tile(params, (len(params) + 1, 1))
+        stencil[1:] += step * np.eye(len(params))
+        costs = self.cost_func_batch(stencil)
+        return (costs[1:] - costs[0]) / step
+    
+    def _check_parameter_shift(self):
+        """
+        Verify that the two-term parameter-shift rule applies to the ansatz:
+        every parameter must drive exactly one Pauli rotation gate.
+        """
         if self._ansatz is None:
             raise ValueError("Ansatz not set")
         
-        # Prepare publication for estimator
-        if self._ansatz_isa is None:
-            pub = (self._ansatz, [self._hamiltonian], [params])
-        else:
-            pub = (self._ansatz_isa, [self._hamiltonian_isa], [params])
+        occurrences = {parameter: 0 for parameter in self._ansatz.parameters}
+        for instruction in self._ansatz.data:
+            for value in instruction.operation.params:
+                if not isinstance(value, ParameterExpression):
+                    continue
+                if (instruction.operation.name not in SHIFT_RULE_GATES
+                        or not isinstance(value, Parameter)):
+                    raise ValueError("Parameter-shift gradients require every parameter "
+                                     "to enter a single rx/ry/rz/p gate directly")
+                occurrences[value] += 1
         
-        # Run estimation
-        if isinstance(self._estimator, AerEstimator):
-            result = self._estimator.run(
-                circuits=self._ansatz,
-                observables=self._hamiltonian,
-                parameter_values=params
-            ).result()
-            cost = result.values[0]
+        if any(count != 1 for count in occurrences.values()):
+            raise ValueError("Parameter-shift gradients require every parameter "
+                             "to appear in exactly one gate")
+    
+    def parameter_shift_gradient(self, params):
+        """
+        Analytic gradient of the cost function using the parameter-shift rule.
+        
+        All 2 * num_parameters shifted circuits are evaluated in one batched
+        estimator job.
+        
+        Args:
+            params: Point at which to evaluate the gradient
+            
+        Returns:
+            Gradient vector
+        """
+        params = np.asarray(params, dtype=float)
+        shifts = (np.pi / 2) * np.eye(len(params))
+        costs = self.cost_func_batch(np.vstack([params + shifts, params - shifts]))
+        return (costs[:len(params)] - costs[len(params):]) / 2
+    
+    def _nft_batched(self, x0, maxfev, reset_interval=32, state=None):
+        """
+        Nakanishi-Fujii-Todo coordinate sweep that evaluates both shifted
+        points of each coordinate in one batched estimator job.
+        
+        Args:
+            x0: Initial parameters
+            maxfev: Maximum number of cost evaluations
+            reset_interval: Sweeps between re-evaluations of the current cost
+            state: Optimizer state from a checkpoint to continue from (optional)
+            
+        Returns:
+            scipy OptimizeResult
+        """
+        if state is None:
+            x = np.array(x0, dtype=float)
+            z0 = self.cost_func(x)
+            nfev, nit = 1, 0
         else:
-            result = self._estimator.run(pubs=[pub]).result()
-            cost = result[0].data.evs[0]
+            x = np.array(state["x"], dtype=float)
+            z0, nfev, nit = state["z0"], state["nfev"], state["nit"]
+        n = len(x)
         
-        # Callback tracking
-        if self._callback_step_size != 0:
-            self._callback_dict["iters"] += 1
-            if self._callback_dict["iters"] % self._callback_step_size == 0:
-                self._callback_dict["cost_history"].append(cost)
+        start_nfev = nfev
         
-        return cost
+        while nfev - start_nfev + 2 <= maxfev:
+            # Checkpoints taken during this step resume from its start
+            self._optimizer_state = {"x": x.copy(), "z0": z0, "nfev": nfev, "nit": nit}
+            self._progress = nfev
+            k = nit % n
+            if nit > 0 and k == 0 and (nit // n) % reset_interval == 0:
+                z0 = self.cost_func(x)
+                nfev += 1
+            
+            shifted = np.tile(x, (2, 1))
+            shifted[0, k] += np.pi / 2
+            shifted[1, k] -= np.pi / 2
+            z1, z3 = self.cost_func_batch(shifted)
+            nfev += 2
+            
+            # E(x_k + phi) = a*cos(phi) + b*sin(phi) + c
+            c = (z1 + z3) / 2
+            a = z0 - c
+            b = (z1 - z3) / 2
+            x[k] = np.mod(x[k] + np.arctan2(b, a) + np.pi, 2 * np.pi)
+            z0 = c - np.sqrt(a ** 2 + b ** 2)
+            nit += 1
+        
+        return OptimizeResult(x=x, fun=z0, nfev=nfev, nit=nit, success=True)
+    
+    def _de_objective(self, population):
+        """
+        Vectorized differential evolution objective that keeps the population
+        accepted so far (deferred updating keeps the better of each
+        target/trial pair) as resumable optimizer state.
+        """
+        trial = population.T
+        state = self._optimizer_state
+        if state is not None and np.shape(state["population"]) == trial.shape \
+                and np.allclose(state["population"], trial):
+            # scipy re-submits the checkpointed population when resuming
+            return np.array(state["energies"], dtype=float)
+        # Checkpoints taken during this generation resume from the previous one
+        self._progress = 0 if state is None else state["generations"]
+        costs = self.cost_func_batch(trial)
+        
+        if state is None:
+            members, energies, generations = trial.copy(), costs.copy(), 0
+        else:
+            members = np.array(state["population"], dtype=float)
+            energies = np.array(state["energies"], dtype=float)
+            better = costs < energies
+            members[better] = trial[better]
+            energies[better] = costs[better]
+            generations = state["generations"] + 1
+        self._optimizer_state = {"population": members, "energies": energies,
+                                 "generations": generations}
+        return costs
     
-    def optimize(self, optimizer, x0, maxiter, view_optimizer_result=False):
+    def optimize(self, optimizer, x0, maxiter, view_optimizer_result=False,
+                 batched=False, gradient=None, optimizer_state=None):
         """
         Run the optimization process.
         
@@ -220,39 +705,84 @@ class VQESolver:
             x0: Initial parameters
             maxiter: Maximum number of iterations
             view_optimizer_result: Whether to print optimizer details
+            batched: Whether to pack gradient stencils and NFT sweeps into
+                     batched estimator jobs
+            gradient: Gradient for gradient-based methods ('parameter-shift',
+                      'finite-difference' or None for scipy's default)
+            optimizer_state: Batched NFT or differential evolution state from
+                             a checkpoint (optional); maxiter is then the
+                             budget left after it
             
         Returns:
             Optimized parameters
         """
+        jac = None
+        if optimizer.upper() in GRADIENT_METHODS:
+            if gradient is None and batched:
+                gradient = "finite-difference"
+            if gradient == "parameter-shift":
+                self._check_parameter_shift()
+                jac = self.parameter_shift_gradient
+            elif gradient == "finite-difference":
+                jac = self._finite_difference_jac
+            elif gradient is not None:
+                raise ValueError(f"Unsupported gradient: {gradient}. "
+                                 "Use 'parameter-shift' or 'finite-difference'")
+        
         # Prepare ISA circuits for IBM runtime
-        if isinstance(self._estimator, EstimatorV2):
-            if self._ansatz_isa is None:
-                backend = self._estimator.__getattribute__("_backend")
-                pm = generate_preset_pass_manager(
-                    backend=backend,
-                    target=backend.target,
-                    optimization_level=3
-                )
-                self._ansatz_isa = pm.run(self._ansatz)
-                self._hamiltonian_isa = self._hamiltonian.apply_layout(
-                    self._ansatz_isa.layout
-                )
+        self._prepare_isa()
         
         # Run optimization
-        if optimizer.upper() != "NFT":
-            res = minimize(
-                self.cost_func,
-                x0,
-                method=optimizer,
-                options={'maxiter': maxiter}
-            )
-        else:
-            res = minimize(
-                self.cost_func,
-                x0,
-                method=nakanishi_fujii_todo,
-                options={'maxfev': maxiter}
-            )
+        self._optimizing = True
+        self._optimizer_state = optimizer_state
+        self._count_evaluations = (optimizer.upper() in EVALUATION_BUDGET_METHODS
+                                   or (optimizer.upper() == "NFT" and not batched))
+        try:
+            if optimizer.upper() == "NFT":
+                if batched:
+                    res = self._nft_batched(x0, maxiter, state=optimizer_state)
+                else:
+                    res = minimize(
+                        self.cost_func,
+                        x0,
+                        method=nakanishi_fujii_todo,
+                        options={'maxfev': maxiter}
+                    )
+            elif optimizer.upper() in ["DE", "DIFFERENTIAL_EVOLUTION"]:
+                # Population method: every generation is one batched estimator job.
+                # Costs are 2*pi-periodic, so warm starts and restored populations
+                # are wrapped into the search bounds
+                if optimizer_state is None:
+                    start = {"x0": np.mod(np.asarray(x0, dtype=float), 2 * np.pi)}
+                else:
+                    # Continue from the checkpointed population
+                    population = np.mod(np.array(optimizer_state["population"], dtype=float),
+                                        2 * np.pi)
+                    self._optimizer_state = dict(optimizer_state, population=population)
+                    start = {"init": population}
+                res = differential_evolution(
+                    self._de_objective,
+                    bounds=[(0, 2 * np.pi)] * len(x0),
+                    maxiter=maxiter,
+                    **start,
+                    polish=False,
+                    updating='deferred',
+                    vectorized=True
+                )
+            else:
+                res = minimize(
+                    self.cost_func,
+                    x0,
+                    method=optimizer,
+                    jac=jac,
+                    callback=None if self._count_evaluations else self._count_iteration,
+                    options={'maxiter': maxiter}
+                )
+        except OptimizationStopped as stop:
+            print(f"Optimization stopped early: {stop}")
+            return self._best_parameters
+        finally:
+            self._optimizing = False
         
         if view_optimizer_result:
             print(res)
@@ -261,17 +791,180 @@ class VQESolver:
         
         return res.x
     
+    @contextmanager
+    def external_optimization(self, callback_step_size=0):
+        """
+        Context for an optimization driven outside this class (e.g. by
+        AsyncVQEDriver), which evaluates costs with submit_estimator or
+        run_estimator and passes them to record_costs.
+        
+        Tracking is reset, the ISA circuit prepared and the stop conditions
+        enabled for the duration of the block. Checkpoints are not written,
+        since resume() cannot continue external optimizers. Store the
+        optimized parameters in the yielded dict under 'parameters'; they
+        become last_parameters. An OptimizationStopped raised in the block
+        ends it early with the best parameters evaluated.
+        
+        Args:
+            callback_step_size: Step size for cost history tracking (0 = disabled)
+        """
+        self._reset_tracking(callback_step_size)
+        self._prepare_isa()
+        checkpoint_path = self._checkpoint_path
+        if checkpoint_path is not None:
+            print("Checkpoints are disabled during external optimizations")
+        self._checkpoint_path = None
+        self._optimizing = True
+        outcome = {"parameters": None}
+        try:
+            yield outcome
+        except OptimizationStopped as stop:
+            print(f"Optimization stopped early: {stop}")
+            outcome["parameters"] = self._best_parameters
+        finally:
+            self._optimizing = False
+            self._checkpoint_path = checkpoint_path
+        self._last_parameters = outcome["parameters"]
+    
+    def _count_iteration(self, *args):
+        """scipy callback counting the iterations limited by maxiter."""
+        self._progress += 1
+    
+    def _reset_tracking(self, callback_step_size=0):
+        """Reset cost history, best evaluation and shot accounting for a new solve."""
+        self._callback_step_size = callback_step_size
+        self._callback_dict = {
+            "iters": -1,
+            "cost_history": [],
+        }
+        self._best_cost = None
+        self._best_parameters = None
+        self._optimizer_state = None
+        self._evaluations = 0
+        self._last_checkpoint = 0
+        self._progress = 0
+        if self._shot_schedule is not None:
+            self._shot_schedule.reset()
+    
+    def save_checkpoint(self, path=None, finished=False):
+        """
+        Write the state of the current solve to a checkpoint file.
+        
+        Args:
+            path: Checkpoint file (the set_checkpoint path if None)
+            finished: Mark the solve as complete
+        """
+        path = path or self._checkpoint_path
+        if path is None:
+            raise ValueError("No checkpoint path set")
+        if self._solve_settings is None:
+            raise ValueError("No solve to checkpoint")
+        
+        state = {
+            **self._solve_settings,
+            "evaluations": self._evaluations,
+            "progress": self._progress,
+            "finished": finished,
+            "best_cost": self._best_cost,
+            "best_parameters": self._best_parameters,
+            "last_parameters": self._last_parameters,
+            "callback_dict": self._callback_dict,
+            "optimizer_state": self._optimizer_state,
+            "shot_schedule": (None if self._shot_schedule is None
+                              else self._shot_schedule.state()),
+        }
+        save_checkpoint(path, state, self._hamiltonian, self._ansatz, self._ansatz_isa)
+        self._last_checkpoint = self._evaluations
+    
+    def resume(self, path, maxiter=None, view_optimizer_result=False):
+        """
+        Continue a solve from a checkpoint written by set_checkpoint().
+        
+        The Hamiltonian, ansatz and ISA circuit are restored from the file; the
+        estimator (and backend) must be configured on this solver. Checkpoints
+        of the continued solve go to the same file unless another path is set. Batched NFT
+        and differential evolution continue from their saved state; other
+        optimizers restart from the best parameters found so far. The remaining
+        budget is maxiter minus the budget already spent, counted in the unit
+        maxiter limits: evaluations for COBYLA and NFT, generations for
+        differential evolution and iterations for the other scipy methods.
+        
+        Args:
+            path: Checkpoint file
+            maxiter: Total iteration budget (the original solve's if None)
+            view_optimizer_result: Whether to print optimizer details
+            
+        Returns:
+            Optimized parameters
+        """
+        checkpoint = load_checkpoint(path)
+        state = checkpoint["state"]
+        if self._checkpoint_path is None:
+            # Keep checkpointing the continued solve to the same file
+            self._checkpoint_path = path
+        
+        self._hamiltonian = checkpoint["hamiltonian"]
+        self._num_qubits = self._hamiltonian.num_qubits
+        # The stored ansatz is already decomposed; set it directly
+        self._ansatz = checkpoint["ansatz"]
+        self._numpy_engine = None
+        self._ansatz_isa = None
+        if checkpoint["ansatz_isa"] is not None:
+            self._ansatz_isa = checkpoint["ansatz_isa"]
+            self._hamiltonian_isa = self._hamiltonian.apply_layout(self._ansatz_isa.layout)
+        
+        best_parameters = state["best_parameters"]
+        if state["finished"]:
+            print("Checkpointed solve already finished")
+            self._last_parameters = np.array(state["last_parameters"], dtype=float)
+            return self._last_parameters
+        
+        self._reset_tracking(state["callback_step_size"])
+        self._callback_dict = state["callback_dict"]
+        self._best_cost = state["best_cost"]
+        self._best_parameters = (None if best_parameters is None
+                                 else np.array(best_parameters, dtype=float))
+        self._evaluations = self._last_checkpoint = state["evaluations"]
+        self._progress = state["progress"]
+        if self._shot_schedule is not None and state["shot_schedule"] is not None:
+            self._shot_schedule.set_state(state["shot_schedule"])
+        
+        optimizer = state["optimizer"]
+        optimizer_state = state["optimizer_state"]
+        maxiter = state["maxiter"] if maxiter is None else maxiter
+        if not (optimizer.upper() in ["DE", "DIFFERENTIAL_EVOLUTION"]
+                or (optimizer.upper() == "NFT" and state["batched"])):
+            optimizer_state = None
+        remaining = maxiter - self._progress
+        if remaining <= 0:
+            print("No iterations left in the checkpointed budget")
+            self._last_parameters = self._best_parameters
+            return self._best_parameters
+        
+        x0 = self._best_parameters if self._best_parameters is not None else state["x0"]
+        print(f"Resuming optimization with: {optimizer} "
+              f"({state['evaluations']} evaluations done)")
+        return self._run_solve(optimizer, np.array(x0, dtype=float), remaining,
+                               view_optimizer_result, state["batched"], state["gradient"],
+                               optimizer_state=optimizer_state, total_maxiter=maxiter)
+    
     def solve(self, maxiter: int, optimizer: str = "COBYLA", x0=None,
-              view_optimizer_result=False, callback_step_size=0):
+              view_optimizer_result=False, callback_step_size=0, batched=False,
+              gradient=None, warm_start_maxiter=None):
         """
         Main method to solve the VQE problem.
         
         Args:
             maxiter: Maximum number of iterations
-            optimizer: Optimization method ('COBYLA', 'SLSQP', 'NFT', etc.)
+            optimizer: Optimization method ('COBYLA', 'SLSQP', 'NFT', 'DE', etc.)
             x0: Initial parameters (random if None)
             view_optimizer_result: Whether to print optimizer details
             callback_step_size: Step size for cost history tracking (0 = disabled)
+            batched: Use batched estimator jobs for gradients and NFT sweeps
+            gradient: 'parameter-shift' or 'finite-difference' for gradient-based
+                      optimizers (scipy's default finite differences if None)
+            warm_start_maxiter: Iterations for the short re-optimization when x0
+                                comes from the warm-start store (maxiter if None)
             
         Returns:
             Optimized parameters
@@ -282,26 +975,146 @@ class VQESolver:
             raise ValueError("Ansatz not set")
         
         # Initialize callback tracking
-        self._callback_step_size = callback_step_size
-        self._callback_dict = {
-            "iters": -1,
-            "cost_history": [],
-        }
+        self._reset_tracking(callback_step_size)
         
-        # Generate random initial parameters if not provided
+        # Warm start from the nearest stored solution, or random parameters
+        if x0 is None and self._warm_start_store is not None:
+            warm_start = self._warm_start_store.nearest(
+                self._hamiltonian, self._ansatz, self._warm_start_max_distance
+            )
+            if warm_start is not None:
+                x0, distance = warm_start
+                print(f"Warm start from stored solution (distance {distance:.4f})")
+                if warm_start_maxiter is not None:
+                    maxiter = warm_start_maxiter
         if x0 is None:
             x0 = 2 * np.pi * np.random.rand(self._ansatz.num_parameters)
         elif len(x0) != self._ansatz.num_parameters:
             raise ValueError(f"x0 must have {self._ansatz.num_parameters} parameters")
         
         print(f"Beginning optimization with: {optimizer}")
+        return self._run_solve(optimizer, x0, maxiter, view_optimizer_result, batched, gradient)
+    
+    def _run_solve(self, optimizer, x0, maxiter, view_optimizer_result, batched, gradient,
+                   optimizer_state=None, total_maxiter=None):
+        """Run an optimization from x0 with tracing, checkpoints and warm-start recording."""
+        self._solve_settings = {
+            "optimizer": optimizer,
+            "maxiter": maxiter if total_maxiter is None else total_maxiter,
+            "batched": batched,
+            "gradient": gradient,
+            "callback_step_size": self._callback_step_size,
+            "x0": np.asarray(x0, dtype=float),
+        }
+        
+        if self._trace is not None:
+            self._trace.start_solve(optimizer=optimizer, maxiter=maxiter, engine=self._engine,
+                                    num_qubits=self._num_qubits,
+                                    num_parameters=self._ansatz.num_parameters)
         
         # Run optimization
-        parameters = self.optimize(optimizer, x0, maxiter, view_optimizer_result)
+        parameters = self.optimize(optimizer, x0, maxiter, view_optimizer_result,
+                                   batched=batched, gradient=gradient,
+                                   optimizer_state=optimizer_state)
         self._last_parameters = parameters
         
+        if self._checkpoint_path is not None:
+            self.save_checkpoint(finished=True)
+        
+        if self._trace is not None:
+            self._trace.end_solve(best_cost=None if self._best_cost is None
+                                  else float(self._best_cost))
+        
+        if self._shot_schedule is not None:
+            report = self._shot_schedule.report()
+            print(f"Shots used: {report['total_shots']} over {report['evaluations']} "
+                  f"evaluations (final precision {report['precision']:.4g})")
+        
+        if self._warm_start_store is not None:
+            self._warm_start_store.record(self._hamiltonian, self._ansatz, parameters,
+                                          energy=self._best_cost)
+        
         return parameters
     
+    def solve_multistart(self, n_starts: int, maxiter: int, optimizer: str = "COBYLA",
+                         workers=None, target_energy=None, seed=None,
+                         callback_step_size=0, batched=False, gradient=None):
+        """
+        Run independent VQE restarts concurrently in a process pool.
+        
+        Each restart starts from its own random parameters and runs on the local
+        simulator (the configured local estimator or the NumPy engine). Once a
+        restart reaches target_energy, pending restarts are cancelled and
+        running ones stop at their next evaluation.
+        
+        Args:
+            n_starts: Number of restarts
+            maxiter: Maximum number of iterations per restart
+            optimizer: Optimization method
+            workers: Number of worker processes (CPU count if None)
+            target_energy: Energy at which to stop all restarts (optional)
+            seed: Seed for the initial parameters
+            callback_step_size: Step size for cost history tracking (0 = disabled)
+            batched: Use batched estimator jobs for gradients and NFT sweeps
+            gradient: 'parameter-shift' or 'finite-difference' for gradient methods
+            
+        Returns:
+            dict with 'best_parameters', 'best_energy', 'parameters', 'energies'
+            and 'cost_histories' (one entry per finished restart), and
+            'stopped_early'
+        """
+        if self._hamiltonian is None:
+            raise ValueError("Hamiltonian not set")
+        if self._ansatz is None:
+            raise ValueError("Ansatz not set")
+        if self._engine == "estimator" and isinstance(self._estimator, EstimatorV2):
+            raise ValueError("Multi-start runs require a local simulator estimator "
+                             "or the 'numpy' engine")
+        
+        rng = np.random.default_rng(seed)
+        starts = 2 * np.pi * rng.random((n_starts, self._ansatz.num_parameters))
+        
+        context = multiprocessing.get_context()
+        stop_event = context.Event()
+        results = []
+        
+        print(f"Beginning {n_starts} restarts with: {optimizer}")
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_multistart_worker,
+                                 initargs=(stop_event,)) as pool:
+            futures = [
+                pool.submit(_multistart_worker, self._hamiltonian, self._ansatz,
+                            self._estimator, self._engine, x0, maxiter, optimizer,
+                            callback_step_size, target_energy, batched, gradient)
+                for x0 in starts
+            ]
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                result = future.result()
+                if result[2] is not None:
+                    results.append(result)
+                if stop_event.is_set():
+                    for pending in futures:
+                        pending.cancel()
+        
+        if not results:
+            raise RuntimeError("No restart finished")
+        parameters = [result[0] for result in results]
+        energies = [float(result[1]) for result in results]
+        best = int(np.argmin(energies))
+        self._last_parameters = parameters[best]
+        
+        return {
+            "best_parameters": parameters[best],
+            "best_energy": energies[best],
+            "parameters": parameters,
+            "energies": energies,
+            "cost_histories": [result[2] for result in results],
+            "stopped_early": stop_event.is_set(),
+        }
+    
     def compute_expectation(self, params=None):
         """
         Compute expectation value with given parameters.
@@ -382,7 +1195,8 @@ class VQESolver:
         
         Args:
             params: Parameter values (uses last optimized if None)
-            shots: Number of shots for sampling
+            shots: Number of shots for sampling (not set by the shot schedule;
+                   counted against its budget for V2 samplers)
             
         Returns:
             Measurement statistics
@@ -395,6 +1209,7 @@ class VQESolver:
         if isinstance(self._sampler, Sampler):
             qc = self._ansatz.assign_parameters(params)
             qc.measure_all()
+            start = time.perf_counter()
             result = self._sampler.run(qc).result()
             stats = result.quasi_dists[0]
         else:
@@ -402,14 +1217,21 @@ class VQESolver:
             qc.compose(self._ansatz, inplace=True)
             qc.measure_all()
             backend = self._sampler.__getattribute__("_backend")
-            pm = generate_preset_pass_manager(
-                backend=backend,
-                target=backend.target,
-                optimization_level=3
-            )
-            result = self._sampler.run([(pm.run(qc), params)]).result()[0]
+            start = time.perf_counter()
+            qc_isa = self._transpile_cache.transpile(qc, backend, self._optimization_level)
+            if self._trace is not None:
+                self._trace.record_event("transpile", time.perf_counter() - start,
+                                         circuit="sampler")
+            start = time.perf_counter()
+            result = self._sampler.run([(qc_isa, params)], shots=shots).result()[0]
             stats = result.data.meas.get_counts()
         
+        if self._trace is not None:
+            self._trace.record_event("sample", time.perf_counter() - start, shots=shots)
+        
+        if self._shot_schedule is not None and not isinstance(self._sampler, Sampler):
+            self._shot_schedule.record(1, shots)
+        
         self._last_sampler_stats = stats
         return stats
     
@@ -451,8 +1273,13 @@ class VQESolver:
         print("2. Set ansatz: set_ansatz_type('RealAmplitudes', reps=3)")
         print("   or use set_custom_ansatz(custom_circuit)")
         print("3. (Optional) Set custom estimator/sampler")
+        print("   or set_engine('numpy') for fast local QUBO/Ising simulation")
         print("4. Solve: solve(maxiter=100, optimizer='COBYLA')")
+        print("   or solve_multistart(n_starts=8, maxiter=100) for parallel restarts")
         print("5. Analyze results: compute_expectation(), plot_optimization_history()")
+        print("(Optional) set_shot_schedule(ShotSchedule()) for adaptive precision")
+        print("(Optional) set_trace(PerformanceTrace()) to record timings per evaluation")
+        print("(Optional) set_checkpoint(path) during solves, then resume(path) after a crash")
     
     def print_optimization_options(self):
         """Print available optimization methods."""
@@ -461,3 +1288,6 @@ class VQESolver:
         print("'BFGS' || 'Newton-CG' || 'L-BFGS-B'")
         print("'TNC' || 'COBYLA' || 'SLSQP' || 'trust-exact'")
         print("'trust-constr' || 'dogleg' || 'trust-ncg' || 'trust-krylov'")
+        print("'DE' (differential evolution, batched population)")
+        print("Use solve(..., batched=True) for batched gradients and NFT sweeps")
+        print("Use solve(..., gradient='parameter-shift') for analytic gradients")
@@ -0,0 +1,278 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def greedy_coloring(adjacency):
+    """
+    Greedy coloring of the interaction graph of a QUBO.
+
+    Variables with the same color do not interact, so they can be flipped
+    simultaneously without changing each other's energy deltas.
+
+    Args:
+        adjacency: scipy CSR matrix with the nonzero couplings
+
+    Returns:
+        List of index arrays, one per color
+    """
+    n = adjacency.shape[0]
+    colors = np.full(n, -1, dtype=np.int64)
+    indptr, indices = adjacency.indptr, adjacency.indices
+    for i in range(n):
+        used = colors[indices[indptr[i]:indptr[i + 1]]]
+        used = np.unique(used[used >= 0])
+        # Smallest color not taken by a neighbor
+        gaps = np.flatnonzero(used != np.arange(len(used)))
+        colors[i] = gaps[0] if len(gaps) else len(used)
+    return [np.flatnonzero(colors == color) for color in range(colors.max() + 1)]
+
+
+class QUBOAnnealer:
+    """
+    Batched simulated annealing and parallel tempering for QUBO problems.
+
+    Minimizes x^T Q x over x in {0,1}^n for the same dense or sparse Q used to
+    build the VQESolver Hamiltonian. Many replicas are updated at once: the
+    variables are split into non-interacting color classes, and each class is
+    updated for all replicas with one Metropolis step, keeping per-replica local
+    fields so energy deltas are incremental (O(nnz) per sweep and replica).
+    """
+
+    def __init__(self, Q, dense_threshold=0.1):
+        """
+        Initialize the annealer.
+
+        Args:
+            Q: QUBO matrix, dense numpy array or scipy sparse matrix/array
+            dense_threshold: Coupling density above which dense algebra is used
+        """
+        Q = sp.csr_matrix(Q, dtype=float)
+        if Q.shape[0] != Q.shape[1]:
+            raise ValueError("Q must be a square matrix")
+
+        self._Q = Q
+        self._n = Q.shape[0]
+        self._diagonal = Q.diagonal()
+        couplings = (Q + Q.T).tolil()
+        couplings.setdiag(0)
+        couplings = couplings.tocsr()
+        couplings.eliminate_zeros()
+
+        self._colors = greedy_coloring(couplings)
+        dense = couplings.nnz > dense_threshold * self._n ** 2
+        self._couplings = couplings.toarray() if dense else couplings
+        # Couplings of each color class, sliced once (transposed for sparse
+        # products with the replicas' changes)
+        self._color_rows = [self._couplings[color] if dense
+                            else self._couplings[color].T.tocsr()
+                            for color in self._colors]
+        self._dense = dense
+
+    @property
+    def num_variables(self):
+        return self._n
+
+    @property
+    def num_colors(self):
+        return len(self._colors)
+
+    def energies(self, x):
+        """
+        QUBO energies x^T Q x of a batch of assignments.
+
+        Args:
+            x: Array of shape (batch, n) with 0/1 entries
+
+        Returns:
+            numpy array of length batch
+        """
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        return x @ self._diagonal + 0.5 * np.sum(x * self._fields(x), axis=1)
+
+    def _fields(self, x):
+        """Local fields sum_j (Q_ij + Q_ji) x_j of every replica."""
+        return np.asarray(x @ self._couplings)
+
+    def default_beta_range(self):
+        """
+        Inverse temperatures at which the largest possible energy delta is
+        accepted with probability 1/2 (hot) and the smallest coefficient with
+        probability 1/100 (cold).
+        """
+        couplings = abs(sp.csr_matrix(self._couplings))
+        max_delta = np.max(np.abs(self._diagonal) + np.asarray(couplings.sum(axis=1)).ravel())
+        coefficients = np.concatenate([np.abs(self._diagonal), couplings.data])
+        coefficients = coefficients[coefficients > 0]
+        if len(coefficients) == 0:
+            return 1.0, 1.0
+        return np.log(2) / max_delta, np.log(100) / coefficients.min()
+
+    def _sweep(self, x, fields, energies, betas, rng):
+        """One Metropolis sweep over all color classes, in place."""
+        for color, rows in zip(self._colors, self._color_rows):
+            sign = 1 - 2 * x[:, color]
+            delta = sign * (self._diagonal[color] + fields[:, color])
+            uphill = np.exp(-betas[:, None] * np.maximum(delta, 0))
+            accept = (delta <= 0) | (rng.random(delta.shape) < uphill)
+            if not accept.any():
+                continue
+            change = sign * accept
+            x[:, color] += change
+            fields += change @ rows if self._dense else (rows @ change.T).T
+            energies += np.sum(delta * accept, axis=1)
+
+    def _result(self, x, energies, top_k, start, **info):
+        """Best distinct assignments of a batch of replicas."""
+        unique, index = np.unique(x.astype(np.int8), axis=0, return_index=True)
+        order = np.argsort(energies[index])[:top_k]
+        return {
+            "best_x": unique[order[0]].astype(int),
+            "best_energy": float(energies[index][order[0]]),
+            "samples": unique[order].astype(int),
+            "energies": energies[index][order],
+            "time": time.perf_counter() - start,
+            **info,
+        }
+
+    def anneal(self, num_replicas=64, sweeps=1000, beta_range=None, schedule="geometric",
+               seed=None, top_k=10):
+        """
+        Simulated annealing of a batch of independent replicas.
+
+        Args:
+            num_replicas: Number of replicas annealed together
+            sweeps: Number of sweeps of the schedule
+            beta_range: (hot, cold) inverse temperatures (default_beta_range() if None)
+            schedule: 'geometric' or 'linear' interpolation of beta
+            seed: Random seed
+            top_k: Number of best distinct assignments returned
+
+        Returns:
+            dict with 'best_x', 'best_energy', 'samples' and 'energies' (top_k
+            distinct assignments), 'time' in seconds, and the run settings
+        """
+        start = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        beta_min, beta_max = self.default_beta_range() if beta_range is None else beta_range
+        if schedule == "geometric":
+            betas = np.geomspace(beta_min, beta_max, sweeps)
+        elif schedule == "linear":
+            betas = np.linspace(beta_min, beta_max, sweeps)
+        else:
+            raise ValueError(f"Unsupported schedule: {schedule}. Use 'geometric' or 'linear'")
+
+        x = rng.integers(0, 2, size=(num_replicas, self._n)).astype(float)
+        fields = self._fields(x)
+        energies = self.energies(x)
+        for beta in betas:
+            self._sweep(x, fields, energies, np.full(num_replicas, beta), rng)
+
+        return self._result(x, energies, top_k, start, method="anneal", sweeps=sweeps,
+                            replicas=num_replicas)
+
+    def parallel_tempering(self, num_chains=4, num_temperatures=16, sweeps=1000,
+                           beta_range=None, seed=None, top_k=10):
+        """
+        Parallel tempering: chains of replicas at a ladder of temperatures
+        that exchange states between neighboring temperatures after every sweep.
+
+        Args:
+            num_chains: Independent temperature ladders run together
+            num_temperatures: Replicas per ladder (geometric beta ladder)
+            sweeps: Number of sweeps
+            beta_range: (hot, cold) inverse temperatures (default_beta_range() if None)
+            seed: Random seed
+            top_k: Number of best distinct assignments returned
+
+        Returns:
+            dict as for anneal(), with the best assignments seen at any sweep
+        """
+        start = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        beta_min, beta_max = self.default_beta_range() if beta_range is None else beta_range
+        ladder = np.geomspace(beta_min, beta_max, num_temperatures)
+        betas = np.tile(ladder, num_chains)
+        replicas = num_chains * num_temperatures
+
+        x = rng.integers(0, 2, size=(replicas, self._n)).astype(float)
+        fields = self._fields(x)
+        energies = self.energies(x)
+        best_x, best_energies = x.copy(), energies.copy()
+
+        # Replica r of chain c sits at index c * num_temperatures + t
+        chain_offset = np.arange(num_chains)[:, None] * num_temperatures
+        for sweep in range(sweeps):
+            self._sweep(x, fields, energies, betas, rng)
+
+            # Alternate even and odd neighbor pairs so swaps are disjoint
+            lower = np.arange(sweep % 2, num_temperatures - 1, 2)
+            if len(lower):
+                a = (chain_offset + lower[None, :]).ravel()
+                b = a + 1
+                log_accept = (betas[a] - betas[b]) * (energies[a] - energies[b])
+                swap = np.log(rng.random(len(a))) < log_accept
+                a, b = a[swap], b[swap]
+                x[a], x[b] = x[b], x[a].copy()
+                fields[a], fields[b] = fields[b], fields[a].copy()
+                energies[a], energies[b] = energies[b], energies[a].copy()
+
+            improved = energies < best_energies
+            best_x[improved] = x[improved]
+            best_energies[improved] = energies[improved]
+
+        return self._result(best_x, best_energies, top_k, start, method="parallel_tempering",
+                            sweeps=sweeps, replicas=replicas)
+
+
+def _solve_worker(Q, method, options, seed):
+    """Run one annealing or tempering job in a worker process."""
+    annealer = QUBOAnnealer(Q)
+    return getattr(annealer, method)(seed=seed, **options)
+
+
+def solve_qubo_annealing(Q, method="anneal", workers=1, seed=None, top_k=10, **options):
+    """
+    Solve a QUBO with simulated annealing or parallel tempering, optionally
+    running independent jobs in a process pool and merging their results.
+
+    Args:
+        Q: QUBO matrix, dense numpy array or scipy sparse matrix/array
+        method: 'anneal' or 'parallel_tempering'
+        workers: Number of worker processes, each running an independent job
+        seed: Random seed
+        top_k: Number of best distinct assignments returned
+        **options: Arguments of QUBOAnnealer.anneal or parallel_tempering
+
+    Returns:
+        dict with 'best_x', 'best_energy', 'samples', 'energies' and 'time'
+        (wall time of the whole solve)
+    """
+    if method not in ["anneal", "parallel_tempering"]:
+        raise ValueError(f"Unsupported method: {method}. Use 'anneal' or 'parallel_tempering'")
+
+    start = time.perf_counter()
+    options["top_k"] = top_k
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    if workers == 1:
+        results = [_solve_worker(Q, method, options, seeds[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_worker, [Q] * workers, [method] * workers,
+                                    [options] * workers, seeds))
+
+    samples = np.vstack([result["samples"] for result in results])
+    energies = np.concatenate([result["energies"] for result in results])
+    samples, index = np.unique(samples, axis=0, return_index=True)
+    order = np.argsort(energies[index])[:top_k]
+    return {
+        "best_x": samples[order[0]],
+        "best_energy": float(energies[index][order[0]]),
+        "samples": samples[order],
+        "energies": energies[index][order],
+        "time": time.perf_counter() - start,
+        "method": method,
+        "workers": workers,
+    }
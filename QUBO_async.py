@@ -0,0 +1,327 @@
+import time
+import asyncio
+
+import numpy as np
+from scipy.optimize import differential_evolution, OptimizeResult
+
+from QUBO_VQE import OptimizationStopped
+
+
+class AsyncVQEDriver:
+    """
+    asyncio driver that keeps several estimator jobs of a VQESolver in flight.
+
+    Each evaluation is one batched estimator job, submitted and awaited in a
+    worker thread so that the event loop can overlap queue latency of up to
+    `max_in_flight` jobs. Jobs that exceed `timeout` are cancelled and
+    resubmitted up to `retries` times. The optimizers are written to issue
+    independent evaluations concurrently: SPSA resamples several perturbation
+    pairs per step, NFT fits a block of coordinates at once and differential
+    evolution splits each generation across jobs.
+
+    Works with any estimator supported by VQESolver, including runtime
+    EstimatorV2 on a fake backend for local testing.
+
+    A timed-out job is cancelled, but the thread waiting on its result keeps
+    running until the job ends: runtime jobs end when the cancellation is
+    processed, whereas local primitive jobs that are already running ignore
+    cancel() and finish in the background. Checkpoints (set_checkpoint) are
+    not written during asynchronous solves, since VQESolver.resume cannot
+    continue these optimizers.
+    """
+
+    def __init__(self, solver, max_in_flight=4, timeout=None, retries=2):
+        """
+        Initialize the driver.
+
+        Args:
+            solver: Configured VQESolver (Hamiltonian, ansatz and estimator set)
+            max_in_flight: Maximum number of concurrent estimator jobs
+            timeout: Seconds to wait for a job before cancelling it (None = no limit)
+            retries: Number of resubmissions after a failed or timed-out job
+        """
+        self._solver = solver
+        self._max_in_flight = max_in_flight
+        self._timeout = timeout
+        self._retries = retries
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._jobs = set()
+        self._cancelled = False
+        self._stats = {"jobs": 0, "timeouts": 0, "failures": 0}
+
+    @property
+    def stats(self):
+        return dict(self._stats)
+
+    def cancel(self):
+        """Cancel all in-flight jobs and stop the running optimization."""
+        self._cancelled = True
+        for job in list(self._jobs):
+            try:
+                job.cancel()
+            except Exception:
+                pass
+
+    async def _wait_job(self, param_matrix):
+        """
+        Submit one job and wait for its values, with timeout.
+
+        On timeout, or when the awaiting task is cancelled, the job is
+        cancelled; the thread blocked in job.result() is not interruptible
+        and returns once the job ends (see class notes).
+        """
+        job = await asyncio.to_thread(self._solver.submit_estimator, param_matrix)
+        self._jobs.add(job)
+        self._stats["jobs"] += 1
+        try:
+            result = await asyncio.wait_for(asyncio.to_thread(job.result), self._timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as error:
+            if isinstance(error, asyncio.TimeoutError):
+                self._stats["timeouts"] += 1
+            try:
+                job.cancel()
+            except Exception:
+                pass
+            raise
+        finally:
+            self._jobs.discard(job)
+        return self._solver.estimator_values(result)
+
+    async def evaluate(self, param_matrix):
+        """
+        Evaluate a batch of parameter sets as one estimator job.
+
+        Args:
+            param_matrix: Array of shape (batch, num_parameters)
+
+        Returns:
+            numpy array of costs, one per parameter set
+        """
+        param_matrix = np.atleast_2d(np.asarray(param_matrix, dtype=float))
+        # Semaphores are bound to one event loop; the driver may be reused
+        # across asyncio.run calls
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_in_flight)
+            self._semaphore_loop = loop
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            if self._solver.engine == "numpy":
+                costs = await asyncio.to_thread(self._solver.run_estimator, param_matrix)
+            else:
+                last_error = None
+                for _ in range(self._retries + 1):
+                    if self._cancelled:
+                        raise OptimizationStopped("Driver cancelled")
+                    try:
+                        costs = await self._wait_job(param_matrix)
+                        break
+                    except Exception as error:
+                        if self._cancelled:
+                            raise OptimizationStopped("Driver cancelled")
+                        if not isinstance(error, asyncio.TimeoutError):
+                            self._stats["failures"] += 1
+                        last_error = error
+                else:
+                    raise RuntimeError(f"Estimator job failed after {self._retries + 1} "
+                                       f"attempts") from last_error
+            latency = time.perf_counter() - start
+
+        # Callback tracking, best evaluation and stop conditions
+        self._solver.record_costs(costs, param_matrix, latency)
+        return costs
+
+    async def evaluate_many(self, param_matrices):
+        """
+        Evaluate several batches concurrently, one job per batch.
+
+        If one evaluation fails (e.g. a stop condition raises
+        OptimizationStopped), the others are cancelled along with their
+        estimator jobs before the error is raised.
+        """
+        tasks = [asyncio.ensure_future(self.evaluate(matrix)) for matrix in param_matrices]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def evaluate_population(self, population):
+        """Evaluate a population split into up to `max_in_flight` concurrent jobs."""
+        chunks = np.array_split(population, min(self._max_in_flight, len(population)))
+        return np.concatenate(await self.evaluate_many(chunks))
+
+    async def spsa(self, x0, maxiter, a=0.2, c=0.1, alpha=0.602, gamma=0.101,
+                   stability=None, resamplings=None, seed=None):
+        """
+        SPSA with several perturbation pairs evaluated concurrently per step.
+
+        Args:
+            x0: Initial parameters
+            maxiter: Number of iterations
+            a, c, alpha, gamma: Standard SPSA gain parameters
+            stability: Stability constant A of the step size (10% of maxiter if None)
+            resamplings: Perturbation pairs averaged per step (max_in_flight if None)
+            seed: Seed for the perturbation directions
+
+        Returns:
+            scipy OptimizeResult
+        """
+        rng = np.random.default_rng(seed)
+        resamplings = resamplings or self._max_in_flight
+        stability = 0.1 * maxiter if stability is None else stability
+        x = np.array(x0, dtype=float)
+
+        for k in range(maxiter):
+            ak = a / (k + 1 + stability) ** alpha
+            ck = c / (k + 1) ** gamma
+            deltas = rng.choice([-1.0, 1.0], size=(resamplings, len(x)))
+            pairs = await self.evaluate_many([np.vstack([x + ck * delta, x - ck * delta])
+                                              for delta in deltas])
+            # Perturbations are +-1, so dividing by delta is multiplying by it
+            gradient = np.mean([(fp - fm) / (2 * ck) * delta
+                                for (fp, fm), delta in zip(pairs, deltas)], axis=0)
+            x = x - ak * gradient
+
+        fun = (await self.evaluate([x]))[0]
+        return OptimizeResult(x=x, fun=fun, nit=maxiter, success=True)
+
+    async def nft(self, x0, maxfev, block_size=None):
+        """
+        Nakanishi-Fujii-Todo sweep that fits a block of coordinates concurrently.
+
+        The shifted evaluations of `block_size` coordinates are submitted at
+        once. The joint update of the block is kept when it beats the best
+        single-coordinate update; otherwise only that exact single update is
+        applied, so the cost never increases (up to estimator noise).
+
+        Args:
+            x0: Initial parameters
+            maxfev: Maximum number of cost evaluations
+            block_size: Coordinates per block (max_in_flight if None)
+
+        Returns:
+            scipy OptimizeResult
+        """
+        x = np.array(x0, dtype=float)
+        n = len(x)
+        block_size = min(block_size or self._max_in_flight, n)
+        z0 = (await self.evaluate([x]))[0]
+        nfev, nit, start = 1, 0, 0
+
+        while nfev + 2 * block_size + 1 <= maxfev:
+            coords = [(start + i) % n for i in range(block_size)]
+            shifted = []
+            for k in coords:
+                pair = np.tile(x, (2, 1))
+                pair[0, k] += np.pi / 2
+                pair[1, k] -= np.pi / 2
+                shifted.append(pair)
+            results = await self.evaluate_many(shifted)
+            nfev += 2 * block_size
+
+            # E(x_k + phi) = a*cos(phi) + b*sin(phi) + c for each coordinate
+            proposal = x.copy()
+            predicted = []
+            for k, (z1, z3) in zip(coords, results):
+                c = (z1 + z3) / 2
+                a = z0 - c
+                b = (z1 - z3) / 2
+                proposal[k] = np.mod(x[k] + np.arctan2(b, a) + np.pi, 2 * np.pi)
+                predicted.append(c - np.sqrt(a ** 2 + b ** 2))
+
+            best = int(np.argmin(predicted))
+            if block_size > 1:
+                z_joint = (await self.evaluate([proposal]))[0]
+                nfev += 1
+            if block_size > 1 and z_joint <= predicted[best]:
+                x, z0 = proposal, z_joint
+            else:
+                x[coords[best]] = proposal[coords[best]]
+                z0 = predicted[best]
+
+            start = (start + block_size) % n
+            nit += 1
+
+        return OptimizeResult(x=x, fun=z0, nfev=nfev, nit=nit, success=True)
+
+    async def differential_evolution(self, x0, maxiter, popsize=15, seed=None):
+        """
+        Differential evolution with each generation split across concurrent jobs.
+
+        Args:
+            x0: Initial parameters (included in the initial population, wrapped
+                into the [0, 2*pi] bounds)
+            maxiter: Maximum number of generations
+            popsize: Population size multiplier (as in scipy)
+            seed: Random seed
+
+        Returns:
+            scipy OptimizeResult
+        """
+        loop = asyncio.get_running_loop()
+
+        def objective(population):
+            # Runs in scipy's worker thread; evaluations go back to the event loop
+            future = asyncio.run_coroutine_threadsafe(
+                self.evaluate_population(population.T), loop
+            )
+            return future.result()
+
+        return await asyncio.to_thread(
+            differential_evolution,
+            objective,
+            bounds=[(0, 2 * np.pi)] * len(x0),
+            x0=np.mod(np.asarray(x0, dtype=float), 2 * np.pi),
+            maxiter=maxiter,
+            popsize=popsize,
+            seed=seed,
+            polish=False,
+            updating='deferred',
+            vectorized=True
+        )
+
+    async def solve(self, maxiter, optimizer="SPSA", x0=None, callback_step_size=0, **options):
+        """
+        Run an asynchronous VQE optimization.
+
+        Args:
+            maxiter: Maximum iterations (SPSA, DE) or evaluations (NFT)
+            optimizer: 'SPSA', 'NFT' or 'DE'
+            x0: Initial parameters (random if None)
+            callback_step_size: Step size for cost history tracking (0 = disabled)
+            **options: Extra keyword arguments for the optimizer
+
+        Returns:
+            Optimized parameters
+        """
+        solver = self._solver
+        if solver.ansatz is None:
+            raise ValueError("Ansatz not set")
+        if x0 is None:
+            x0 = 2 * np.pi * np.random.rand(solver.ansatz.num_parameters)
+
+        methods = {"SPSA": self.spsa, "NFT": self.nft, "DE": self.differential_evolution}
+        if optimizer.upper() not in methods:
+            raise ValueError(f"Unsupported optimizer: {optimizer}. Use 'SPSA', 'NFT' or 'DE'")
+
+        if solver.trace is not None:
+            solver.trace.start_solve(optimizer=f"async-{optimizer}", maxiter=maxiter,
+                                     engine=solver.engine, num_qubits=solver.num_qubits,
+                                     num_parameters=solver.ansatz.num_parameters)
+        self._cancelled = False
+
+        print(f"Beginning asynchronous optimization with: {optimizer}")
+        with solver.external_optimization(callback_step_size) as outcome:
+            res = await methods[optimizer.upper()](x0, maxiter, **options)
+            outcome["parameters"] = res.x
+            print("Optimization finished")
+
+        if solver.trace is not None:
+            solver.trace.end_solve(best_cost=None if solver.best_cost is None
+                                   else float(solver.best_cost), **self.stats)
+        return solver.last_parameters
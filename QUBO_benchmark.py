@@ -0,0 +1,242 @@
+import io
+import os
+import sys
+import json
+import time
+import platform
+import itertools
+import subprocess
+import contextlib
+import multiprocessing
+
+import numpy as np
+import scipy
+import qiskit
+from qiskit.quantum_info import SparsePauliOp
+
+from QUBO_VQE import VQESolver
+from QUBO_trace import PerformanceTrace
+from QUBO_statevector import diagonal_energies
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Fields identifying a benchmark configuration, used to match runs across versions
+CONFIG_FIELDS = ["num_qubits", "ansatz", "reps", "optimizer", "maxiter", "engine",
+                 "batched", "seed"]
+
+
+def random_ising_hamiltonian(num_qubits, density=0.5, seed=None):
+    """
+    Random Ising Hamiltonian with Gaussian fields and couplings.
+
+    Args:
+        num_qubits: Number of qubits (spins)
+        density: Probability that each pair of spins is coupled
+        seed: Random seed
+
+    Returns:
+        SparsePauliOp with Z and ZZ terms
+    """
+    rng = np.random.default_rng(seed)
+    terms = [("Z", [i], rng.normal()) for i in range(num_qubits)]
+    for i, j in itertools.combinations(range(num_qubits), 2):
+        if rng.random() < density:
+            terms.append(("ZZ", [i, j], rng.normal()))
+    return SparsePauliOp.from_sparse_list(terms, num_qubits=num_qubits)
+
+
+def environment_info():
+    """Versions and revision the benchmark ran with."""
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                  text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "revision": revision,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "qiskit": qiskit.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def run_config(config):
+    """
+    Run one benchmark configuration.
+
+    The target gap is relative to the spectrum: (E - E0) / (Emax - E0), where
+    E0 and Emax are the exact ground and highest energies.
+
+    Args:
+        config: dict with the CONFIG_FIELDS and 'target_gap'
+
+    Returns:
+        dict with the configuration and its measurements
+    """
+    rss_start = _peak_rss_mb()
+    hamiltonian = random_ising_hamiltonian(config["num_qubits"], seed=config["seed"])
+    energies = diagonal_energies(hamiltonian)
+    exact, highest = float(energies.min()), float(energies.max())
+
+    solver = VQESolver(hamiltonian)
+    solver.set_ansatz_type(config["ansatz"], reps=config["reps"])
+    solver.set_engine(config["engine"])
+    trace = PerformanceTrace()
+    solver.set_trace(trace)
+
+    rng = np.random.default_rng(config["seed"])
+    x0 = 2 * np.pi * rng.random(solver.ansatz.num_parameters)
+    # Keep the solver's progress messages out of the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        solver.solve(config["maxiter"], config["optimizer"], x0=x0, batched=config["batched"])
+
+    costs = np.array([record["cost"] for record in trace.records
+                      if record["type"] == "evaluation"])
+    gaps = (costs - exact) / (highest - exact)
+    reached = np.nonzero(gaps <= config["target_gap"])[0]
+    summary = trace.solves[-1]
+    rss_end = _peak_rss_mb()
+
+    return {
+        **config,
+        "num_parameters": solver.ansatz.num_parameters,
+        "wall_time": summary["wall_time"],
+        "estimator_time": summary["estimator_time"],
+        "optimizer_time": summary["optimizer_time"],
+        "evaluations": len(costs),
+        "evaluations_to_target": int(reached[0]) + 1 if len(reached) else None,
+        "exact_energy": exact,
+        "best_energy": float(costs.min()),
+        "best_gap": float(gaps.min()),
+        "peak_rss_mb": rss_end,
+        "rss_increase_mb": None if rss_end is None else rss_end - rss_start,
+    }
+
+
+def run_benchmark(qubits=(4, 6, 8), ansatz_types=("RealAmplitudes", "RY", "EfficientSU2"),
+                  reps=(1, 2), optimizers=("COBYLA", "NFT", "SLSQP", "DE"), maxiter=200,
+                  target_gap=0.05, seeds=(0, 1, 2), engine="numpy", batched=False,
+                  output="benchmark_results.jsonl", workers=1):
+    """
+    Sweep VQESolver configurations and write one JSON line per run.
+
+    Every run happens in a fresh worker process, so peak memory is measured
+    per configuration. With workers > 1 runs overlap and wall times are
+    only comparable between runs made with the same worker count.
+
+    Args:
+        qubits: Qubit counts to sweep
+        ansatz_types: set_ansatz_type choices
+        reps: Ansatz repetitions
+        optimizers: Optimizer names (maxiter is maxfev for NFT and generations for DE)
+        maxiter: Iteration budget of every run
+        target_gap: Relative spectral gap counted as reaching the ground state
+        seeds: Seeds for the problem instance and the initial parameters
+        engine: 'numpy' or 'estimator'
+        batched: Use batched estimator jobs
+        output: JSON lines file the results are appended to (None = not written)
+        workers: Number of configurations run concurrently
+
+    Returns:
+        List of result dicts
+    """
+    environment = environment_info()
+    configs = [
+        {"num_qubits": n, "ansatz": ansatz, "reps": r, "optimizer": optimizer,
+         "maxiter": maxiter, "engine": engine, "batched": batched, "seed": seed,
+         "target_gap": target_gap}
+        for n, ansatz, r, optimizer, seed
+        in itertools.product(qubits, ansatz_types, reps, optimizers, seeds)
+    ]
+
+    print(f"Running {len(configs)} benchmark configurations")
+    results = []
+    start = time.time()
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=workers, maxtasksperchild=1) as pool:
+        for result in pool.imap_unordered(run_config, configs):
+            result["environment"] = environment
+            results.append(result)
+            if output is not None:
+                with open(output, "a") as f:
+                    f.write(json.dumps(result) + "\n")
+            print(f"[{len(results)}/{len(configs)}] {result['num_qubits']} qubits "
+                  f"{result['ansatz']} reps={result['reps']} {result['optimizer']}: "
+                  f"{result['wall_time']:.2f}s, evals to target "
+                  f"{result['evaluations_to_target']}")
+
+    print(f"Benchmark finished in {time.time() - start:.1f}s")
+    return results
+
+
+def load_results(path):
+    """Read a JSON lines benchmark file."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare_benchmarks(baseline, current, metric="wall_time"):
+    """
+    Compare a metric between two benchmark runs, matching configurations.
+
+    Args:
+        baseline: Path or list of results of the reference version
+        current: Path or list of results of the version under test
+        metric: Result field to compare
+
+    Returns:
+        List of dicts with the configuration, the median baseline and current
+        values and their ratio, slowest regressions first
+    """
+    groups = {}
+    for label, results in [("baseline", baseline), ("current", current)]:
+        if isinstance(results, str):
+            results = load_results(results)
+        for result in results:
+            # Seeds are repeats of the same configuration
+            key = tuple(result[field] for field in CONFIG_FIELDS if field != "seed")
+            if result[metric] is not None:
+                groups.setdefault(key, {"baseline": [], "current": []})[label].append(result[metric])
+
+    comparison = []
+    for key, values in groups.items():
+        if not values["baseline"] or not values["current"]:
+            continue
+        before, after = np.median(values["baseline"]), np.median(values["current"])
+        comparison.append({
+            **dict(zip([field for field in CONFIG_FIELDS if field != "seed"], key)),
+            "baseline": float(before),
+            "current": float(after),
+            "ratio": float(after / before) if before else None,
+        })
+    comparison.sort(key=lambda row: -np.inf if row["ratio"] is None else row["ratio"],
+                    reverse=True)
+    return comparison
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        qubits=(4, 6, 8),
+        ansatz_types=("RealAmplitudes", "RY"),
+        reps=(1, 2),
+        optimizers=("COBYLA", "NFT", "SLSQP"),
+        maxiter=200,
+        seeds=(0, 1, 2),
+        output="benchmark_results.jsonl"
+    )
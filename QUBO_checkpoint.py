@@ -0,0 +1,81 @@
+import io
+import os
+import json
+import base64
+
+import numpy as np
+from qiskit import qpy
+from qiskit.quantum_info import SparsePauliOp
+
+
+def _circuit_to_text(circuit):
+    """Serialize a circuit (with its layout) as base64 QPY."""
+    buffer = io.BytesIO()
+    qpy.dump(circuit, buffer)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def _circuit_from_text(text):
+    return qpy.load(io.BytesIO(base64.b64decode(text)))[0]
+
+
+def _to_json(value):
+    """Convert numpy arrays and scalars in a state dict to JSON types."""
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def save_checkpoint(path, state, hamiltonian, ansatz, ansatz_isa=None):
+    """
+    Write a VQE checkpoint to a single JSON file.
+
+    The file is written to a temporary name and renamed, so an interrupted
+    write never corrupts the previous checkpoint.
+
+    Args:
+        path: Checkpoint file
+        state: dict with the solve settings, progress and optimizer state
+        hamiltonian: SparsePauliOp being solved
+        ansatz: Ansatz circuit
+        ansatz_isa: Transpiled ISA circuit (optional)
+    """
+    checkpoint = {
+        "state": _to_json(state),
+        "hamiltonian": [[label, [float(np.real(coeff)), float(np.imag(coeff))]]
+                        for label, coeff in hamiltonian.to_list()],
+        "ansatz": _circuit_to_text(ansatz),
+        "ansatz_isa": None if ansatz_isa is None else _circuit_to_text(ansatz_isa),
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Read a checkpoint written by save_checkpoint.
+
+    Returns:
+        dict with 'state', 'hamiltonian' (SparsePauliOp), 'ansatz' and
+        'ansatz_isa' (QuantumCircuit or None)
+    """
+    with open(path) as f:
+        checkpoint = json.load(f)
+
+    hamiltonian = SparsePauliOp.from_list([(label, complex(re, im))
+                                           for label, (re, im) in checkpoint["hamiltonian"]])
+    return {
+        "state": checkpoint["state"],
+        "hamiltonian": hamiltonian,
+        "ansatz": _circuit_from_text(checkpoint["ansatz"]),
+        "ansatz_isa": (None if checkpoint["ansatz_isa"] is None
+                       else _circuit_from_text(checkpoint["ansatz_isa"])),
+    }
@@ -0,0 +1,280 @@
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.ndimage import distance_transform_cdt
+
+from QUBO_ising import qubo_energy, qubo_to_ising_hamiltonian
+from QUBO_firefighter import firefighter_objective, firefighter_qubo, slack_weights
+from QUBO_exact import solve_qubo_exact
+from QUBO_anneal import solve_qubo_annealing
+
+
+class ExactTileSolver:
+    """Solve tile QUBOs exactly (see solve_qubo_exact)."""
+
+    def __call__(self, Q):
+        return solve_qubo_exact(Q, top_k=1)["best_x"]
+
+
+class AnnealingTileSolver:
+    """Solve tile QUBOs with simulated annealing or parallel tempering."""
+
+    def __init__(self, method="anneal", seed=None, **options):
+        self._method = method
+        self._seed = seed
+        self._options = options
+
+    def __call__(self, Q):
+        return solve_qubo_annealing(Q, self._method, seed=self._seed, **self._options)["best_x"]
+
+
+class VQETileSolver:
+    """
+    Solve tile QUBOs with VQESolver.
+
+    The optimized state is sampled and the most probable bitstrings are
+    evaluated on the QUBO, keeping the best one.
+    """
+
+    def __init__(self, ansatz_type="RealAmplitudes", reps=2, maxiter=200, optimizer="COBYLA",
+                 engine="numpy", candidates=32):
+        self._ansatz_type = ansatz_type
+        self._reps = reps
+        self._maxiter = maxiter
+        self._optimizer = optimizer
+        self._engine = engine
+        self._candidates = candidates
+
+    def __call__(self, Q):
+        # Imported here so annealing/exact decompositions do not need qiskit
+        from QUBO_VQE import VQESolver
+
+        hamiltonian, _ = qubo_to_ising_hamiltonian(Q)
+        n = hamiltonian.num_qubits
+        solver = VQESolver(hamiltonian)
+        solver.set_ansatz_type(self._ansatz_type, reps=self._reps)
+        solver.set_engine(self._engine)
+        solver.solve(self._maxiter, self._optimizer)
+
+        stats = solver.sample_circuit()
+        if not isinstance(next(iter(stats)), int):
+            stats = {int(key, 2): value for key, value in stats.items()}
+        keys = sorted(stats, key=stats.get, reverse=True)[:self._candidates]
+        # Bitstrings read left to right as x_0..x_{n-1} (qubit n-1-i holds x_i)
+        samples = (np.array(keys)[:, None] >> (n - 1 - np.arange(n))) & 1
+        return samples[np.argmin(qubo_energy(Q, samples))]
+
+
+def _solve_tile(solver, Q):
+    return np.asarray(solver(Q)).astype(int)
+
+
+def partition_cells(coords, capacity, overlap=1, seeds=None):
+    """
+    Split cells into overlapping spatial tiles of at most `capacity` cells.
+
+    Each tile starts from the first unassigned seed cell and grows its core
+    breadth-first over the 4-neighborhood of unassigned cells, as long as the
+    core plus its halo (the cells within Manhattan distance `overlap` of the
+    core, assigned or not) fits the capacity. Overlapping halos let
+    neighboring tiles both optimize the cells along their shared boundary.
+    When even a single cell's halo is too large, the nearest halo cells are
+    kept.
+
+    Args:
+        coords: Array of shape (n, 2) with the (i, j) coordinates of the cells
+        capacity: Maximum number of cells per tile
+        overlap: Halo width in cells (Manhattan distance)
+        seeds: Indices into coords in the order tiles are started from, e.g.
+               the fire frontier first (the remaining cells follow in order)
+
+    Returns:
+        List of (core, tile) index arrays into coords; cores partition the
+        cells and each tile contains its core
+    """
+    coords = np.asarray(coords, dtype=np.int64).reshape(-1, 2)
+    position = {(i, j): k for k, (i, j) in enumerate(coords.tolist())}
+    halo_steps = [(di, dj) for di in range(-overlap, overlap + 1)
+                  for dj in range(abs(di) - overlap, overlap - abs(di) + 1) if (di, dj) != (0, 0)]
+    neighbors = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+    order = np.arange(len(coords)) if seeds is None else np.asarray(seeds, dtype=np.int64)
+    if seeds is not None:
+        rest = np.ones(len(coords), dtype=bool)
+        rest[order] = False
+        order = np.concatenate([order, np.flatnonzero(rest)])
+
+    assigned = np.zeros(len(coords), dtype=bool)
+    tiles = []
+    for seed in order.tolist():
+        if assigned[seed]:
+            continue
+        core, halo = [], {}
+        queue, queued = deque([seed]), {seed}
+        while queue:
+            cell = queue.popleft()
+            i, j = coords[cell]
+            grown = dict(halo)
+            grown.pop(cell, None)
+            for di, dj in halo_steps:
+                other = position.get((i + di, j + dj))
+                if other is None or other in core or other == cell:
+                    continue
+                grown[other] = min(grown.get(other, overlap), abs(di) + abs(dj))
+            if core and len(core) + 1 + len(grown) > capacity:
+                break
+            core.append(cell)
+            assigned[cell] = True
+            halo = grown
+            for di, dj in neighbors:
+                other = position.get((i + di, j + dj))
+                if other is not None and not assigned[other] and other not in queued:
+                    queued.add(other)
+                    queue.append(other)
+
+        # Nearest halo cells first
+        ring = sorted(halo, key=lambda other: (halo[other], other))[:capacity - len(core)]
+        tiles.append((np.sort(core), np.sort(core + ring)))
+    return tiles
+
+
+def _repair(x, budget, linear):
+    """Undefend the least valuable cells until the tile budget holds."""
+    x = x.copy()
+    defended = np.flatnonzero(x)
+    if len(defended) > budget:
+        # Most negative linear coefficient = most valuable defense
+        keep = defended[np.argsort(linear[defended])[:budget]]
+        x[:] = 0
+        x[keep] = 1
+    return x
+
+
+def solve_firefighter_decomposed(C, budget, columns, defendable=None, qubit_budget=20,
+                                 overlap=1, solver=None, workers=1, max_iterations=10,
+                                 initial=None, burning=None):
+    """
+    Solve a large firefighter QUBO by spatial decomposition.
+
+    The active cells (those with couplings that the risk constraint allows to
+    be defended) are partitioned into overlapping tiles sized to the qubit
+    budget, including the tile's budget slack bits. Tiles are grown around
+    the fire: first from the frontier cells S (the coupling sources), then
+    from the other active cells, each group nearest to the burning cells S0
+    first when they are given (see partition_cells). Each iteration solves every
+    tile concurrently with the rest of the grid fixed at the current
+    assignment, giving each tile its current defenders plus the unused part
+    of the budget W. Tile solutions are then applied greedily, best first,
+    keeping only those that still satisfy the global budget and lower the
+    exact global objective, so the objective never increases. Iterations stop
+    when no tile improves.
+
+    Args:
+        C: Sparse couplings over all cells (see coupling_matrix)
+        budget: Total number of cells that can be defended (W)
+        columns: Number of grid columns, to recover cell coordinates
+        defendable: Flat boolean mask of cells allowed by the risk constraint
+        qubit_budget: Maximum qubits (variables plus slack bits) per tile
+        overlap: Halo width of the tiles in cells
+        solver: Callable mapping a QUBO matrix to a binary assignment
+                (ExactTileSolver() if None; see also AnnealingTileSolver and
+                VQETileSolver)
+        workers: Number of tiles solved concurrently in worker processes
+        max_iterations: Maximum number of improvement rounds
+        initial: Initial assignment of all cells (nothing defended if None)
+        burning: Flat indices of the burning cells S0, to seed tiles nearest
+                 to the fire first (optional)
+
+    Returns:
+        dict with 'assignment' (0/1 per cell), 'defended' (flat indices),
+        'objective', 'history' (objective after each iteration), 'num_tiles',
+        'iterations' and 'time'
+    """
+    start = time.perf_counter()
+    C = sp.csr_matrix(C)
+    n = C.shape[0]
+    solver = ExactTileSolver() if solver is None else solver
+    defendable = np.ones(n, dtype=bool) if defendable is None else np.asarray(defendable)
+
+    Q_full, offset_full = firefighter_objective(C)
+    coupled = (np.diff(C.indptr) > 0) | (np.diff(C.tocsc().indptr) > 0)
+    active = np.flatnonzero(coupled & defendable)
+    capacity = qubit_budget - len(slack_weights(budget))
+    if capacity < 1:
+        raise ValueError(f"qubit_budget {qubit_budget} leaves no room for variables "
+                         f"next to the slack bits of budget {budget}")
+
+    coords = np.stack([active // columns, active % columns], axis=1)
+    frontier = np.diff(C.indptr)[active] > 0
+    distance = np.zeros(len(active))
+    if burning is not None and len(burning):
+        grid = np.ones((-(-n // columns), columns), dtype=bool)
+        grid.flat[np.asarray(burning, dtype=np.int64)] = False
+        distance = distance_transform_cdt(grid, metric="taxicab")[coords[:, 0], coords[:, 1]]
+    seeds = np.lexsort((distance, ~frontier))
+    tiles = [(active[core], active[tile]) for core, tile in
+             partition_cells(coords, capacity, overlap, seeds)]
+    print(f"Decomposed {len(active)} active cells into {len(tiles)} tiles")
+
+    x = np.zeros(n) if initial is None else np.asarray(initial, dtype=float).copy()
+    objective = qubo_energy(Q_full, x, offset_full)
+    history = [objective]
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for iteration in range(max_iterations):
+            # Every tile may claim the whole unused budget; the greedy
+            # reconciliation below keeps the global budget satisfied
+            free_budget = budget - int(x.sum())
+            problems = []
+            for _, tile in tiles:
+                tile_budget = min(int(x[tile].sum()) + free_budget, len(tile))
+                problems.append((tile, tile_budget,
+                                 firefighter_qubo(C, tile_budget, tile, x)))
+
+            tile_Qs = [problem[2]["Q"] for problem in problems]
+            if pool is None:
+                solutions = [_solve_tile(solver, Q) for Q in tile_Qs]
+            else:
+                solutions = list(pool.map(_solve_tile, [solver] * len(tile_Qs), tile_Qs))
+
+            # Candidate global assignments, most improving (on their own) first
+            candidates = []
+            for (tile, tile_budget, problem), solution in zip(problems, solutions):
+                linear = problem["Q"].diagonal()[:len(tile)]
+                values = _repair(solution[:len(tile)], tile_budget, linear)
+                candidate = x.copy()
+                candidate[tile] = values
+                candidates.append((qubo_energy(Q_full, candidate, offset_full), tile, values))
+            candidates.sort(key=lambda item: item[0])
+
+            improved = False
+            for _, tile, values in candidates:
+                candidate = x.copy()
+                candidate[tile] = values
+                if candidate.sum() > budget:
+                    continue
+                value = qubo_energy(Q_full, candidate, offset_full)
+                if value < objective - 1e-12:
+                    x, objective, improved = candidate, value, True
+
+            history.append(objective)
+            print(f"Iteration {iteration + 1}: objective {objective:.6f}, "
+                  f"{int(x.sum())}/{budget} defended")
+            if not improved:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return {
+        "assignment": x.astype(int),
+        "defended": np.flatnonzero(x),
+        "objective": objective,
+        "history": history,
+        "num_tiles": len(tiles),
+        "iterations": len(history) - 1,
+        "time": time.perf_counter() - start,
+    }
@@ -0,0 +1,470 @@
+import numpy as np
+import scipy.sparse as sp
+
+from QUBO_ising import restrict_qubo
+
+
+def cell_index(cells, columns):
+    """
+    Flat (row-major) indices of grid cells.
+
+    Args:
+        cells: Iterable of (i, j) cells, or array of shape (k, 2)
+        columns: Number of grid columns
+
+    Returns:
+        numpy array of indices i * columns + j
+    """
+    cells = np.asarray(list(cells), dtype=np.int64).reshape(-1, 2)
+    return cells[:, 0] * columns + cells[:, 1]
+
+
+def _stencil(cutoff, rows, columns):
+    """Offsets (di, dj) and distances within the cutoff radius."""
+    radius_i = rows - 1 if cutoff is None else min(int(np.floor(cutoff)), rows - 1)
+    radius_j = columns - 1 if cutoff is None else min(int(np.floor(cutoff)), columns - 1)
+    di, dj = np.meshgrid(np.arange(-radius_i, radius_i + 1),
+                         np.arange(-radius_j, radius_j + 1), indexing="ij")
+    di, dj = di.ravel(), dj.ravel()
+    dist = np.sqrt(di ** 2 + dj ** 2)
+    keep = (dist > 0) if cutoff is None else (dist > 0) & (dist <= cutoff)
+    return di[keep], dj[keep], dist[keep]
+
+
+def _kernel_matrix(rows, columns, cutoff, weight):
+    """
+    Sparse (rows*columns)^2 matrix with weight(source, target, dist) on every
+    pair of distinct cells within the cutoff, and 1 on the diagonal.
+    """
+    di, dj, dist = _stencil(cutoff, rows, columns)
+    I, J = np.meshgrid(np.arange(rows), np.arange(columns), indexing="ij")
+    I, J = I.ravel(), J.ravel()
+
+    # All (cell, offset) pairs at once, then drop those that leave the grid
+    target_i = I[:, None] + di[None, :]
+    target_j = J[:, None] + dj[None, :]
+    inside = (target_i >= 0) & (target_i < rows) & (target_j >= 0) & (target_j < columns)
+    source = np.broadcast_to((I * columns + J)[:, None], inside.shape)[inside]
+    target = (target_i * columns + target_j)[inside]
+    distance = np.broadcast_to(dist[None, :], inside.shape)[inside]
+
+    n = rows * columns
+    values = weight(source, target, distance)
+    M = sp.coo_matrix((np.concatenate([values, np.ones(n)]),
+                       (np.concatenate([source, np.arange(n)]),
+                        np.concatenate([target, np.arange(n)]))), shape=(n, n)).tocsr()
+    M.eliminate_zeros()
+    return M
+
+
+def ignition_matrix(rows, columns, max_prob=6, decay=1.0, max_prob_M=0.7, min_prob_M=0.01,
+                    cutoff=5.0):
+    """
+    Sparse ignition matrix M from a distance-decay kernel.
+
+    M[k * columns + l, i * columns + j] is the probability that a burning cell
+    (k, l) ignites (i, j): clip(max_prob * exp(-decay * dist), min_prob_M,
+    max_prob_M) for cells within the cutoff radius, 1 on the diagonal and 0
+    beyond the cutoff. With cutoff=None every pair is stored, which reproduces
+    the dense rows x columns x rows x columns array of firefighter_probs.ipynb.
+
+    Args:
+        rows, columns: Grid shape
+        max_prob: Kernel scale
+        decay: Decay rate with Euclidean distance
+        max_prob_M: Upper clip of the probabilities
+        min_prob_M: Lower clip of the probabilities within the cutoff
+        cutoff: Radius (in cells) beyond which cells do not interact
+
+    Returns:
+        scipy CSR matrix of shape (rows * columns, rows * columns)
+    """
+    def weight(source, target, dist):
+        return np.clip(max_prob * np.exp(-decay * dist), min_prob_M, max_prob_M)
+
+    return _kernel_matrix(rows, columns, cutoff, weight)
+
+
+def ignition_matrix_from_probability(prob_map, decay=1.0, max_prob_M=0.7, cutoff=3.0):
+    """
+    Sparse ignition matrix from a ConvLSTM fire probability map.
+
+    The predicted probability of the target cell is used for adjacent sources
+    and decays with distance beyond them:
+    M[source, target] = clip(prob_map[target] * exp(-decay * (dist - 1)), 0, max_prob_M)
+
+    Args:
+        prob_map: Array of shape (rows, columns) with per-cell fire probabilities
+                  (e.g. a sigmoid output of FireSpreadPredictor)
+        decay: Decay rate with distance beyond the adjacent cells
+        max_prob_M: Upper clip of the probabilities
+        cutoff: Radius (in cells) beyond which cells do not interact
+
+    Returns:
+        scipy CSR matrix of shape (rows * columns, rows * columns)
+    """
+    prob_map = np.asarray(prob_map, dtype=float)
+    if prob_map.ndim != 2:
+        raise ValueError("prob_map must be a 2D (rows, columns) array")
+    flat = prob_map.ravel()
+
+    def weight(source, target, dist):
+        return np.clip(flat[target] * np.exp(-decay * np.maximum(dist - 1, 0)), 0, max_prob_M)
+
+    return _kernel_matrix(prob_map.shape[0], prob_map.shape[1], cutoff, weight)
+
+
+def ignition_risk(M, burning, columns=None):
+    """
+    Probability that each cell ignites from the burning cells S0:
+    Pr = 1 - prod_{s in S0} (1 - M[s, :]), computed as a sum of logs.
+
+    Args:
+        M: Sparse ignition matrix (rows*columns square)
+        burning: Flat indices of S0, or (i, j) cells if columns is given
+        columns: Grid columns, to convert (i, j) cells to flat indices
+
+    Returns:
+        numpy array of length rows*columns with the ignition risk (1 for S0)
+    """
+    sources = cell_index(burning, columns) if columns is not None else np.asarray(burning)
+    rows_S0 = sp.csr_matrix(M)[sources]
+    log_survival = rows_S0.copy()
+    with np.errstate(divide="ignore"):
+        log_survival.data = np.log1p(-np.minimum(log_survival.data, 1.0))
+    total = np.asarray(log_survival.sum(axis=0)).ravel()
+    return -np.expm1(total)
+
+
+def risk_levels(risk, max_prob=6):
+    """Integer risk levels round(risk * max_prob), as P_risk in the notebook."""
+    return np.clip(np.round(np.asarray(risk) * max_prob), 0, max_prob).astype(int)
+
+
+def coupling_matrix(M, S):
+    """
+    Sparse QUBO couplings: M restricted to sources in S and targets outside S
+    (Q = M * mask_S[i, j] * ~mask_S[k, l] in the notebook).
+
+    Args:
+        M: Sparse ignition matrix
+        S: Flat indices of the cells that can be defended
+
+    Returns:
+        scipy CSR matrix with the same shape as M
+    """
+    n = M.shape[0]
+    in_S = np.zeros(n, dtype=bool)
+    in_S[np.asarray(S, dtype=np.int64)] = True
+    return (sp.diags(in_S.astype(float)) @ sp.csr_matrix(M)
+            @ sp.diags((~in_S).astype(float))).tocsr()
+
+
+def defendable_cells(P, max_prob=6, delta=1):
+    """
+    Cells allowed by the risk constraint d[i, j] * P[i, j] <= max_prob - delta.
+
+    Returns:
+        Flat boolean mask of the cells that can be defended
+    """
+    return (np.asarray(P) <= max_prob - delta).ravel()
+
+
+def firefighter_objective(C):
+    """
+    QUBO form of the firefighter objective sum_ab C[a, b] (1 - d_a)(1 - d_b).
+
+    Args:
+        C: Sparse couplings (see coupling_matrix)
+
+    Returns:
+        Tuple of (scipy CSR Q, offset) with d^T Q d + offset equal to the objective
+    """
+    C = sp.csr_matrix(C)
+    linear = np.asarray(C.sum(axis=1)).ravel() + np.asarray(C.sum(axis=0)).ravel()
+    return (C - sp.diags(linear)).tocsr(), float(C.sum())
+
+
+def slack_weights(budget):
+    """
+    Bounded binary slack coefficients 1, 2, 4, ..., with the last one chosen
+    so that the slack ranges exactly over 0..budget.
+    """
+    if budget <= 0:
+        return np.zeros(0)
+    num_bits = int(np.floor(np.log2(budget))) + 1
+    weights = 2.0 ** np.arange(num_bits - 1)
+    return np.append(weights, budget - weights.sum())
+
+
+def budget_penalty(num_variables, budget, penalty):
+    """
+    Penalty QUBO for sum(d) <= budget with binary slack bits:
+    penalty * (sum(d) + sum_k w_k s_k - budget)^2
+
+    Args:
+        num_variables: Number of decision variables
+        budget: Maximum number of defended cells W
+        penalty: Penalty weight
+
+    Returns:
+        Tuple of (dense Q over the variables followed by the slack bits,
+        offset, number of slack bits)
+    """
+    weights = np.concatenate([np.ones(num_variables), slack_weights(budget)])
+    Q = penalty * np.outer(weights, weights)
+    Q[np.diag_indices_from(Q)] -= 2 * penalty * budget * weights
+    return Q, penalty * budget ** 2, len(weights) - num_variables
+
+
+BUDGET_ENCODINGS = ["binary", "unbalanced", "domain_wall"]
+RISK_ENCODINGS = ["fixing", "linear", "slack"]
+
+
+def unbalanced_penalty(num_variables, budget, penalty):
+    """
+    Slack-free penalty for sum(d) <= budget (unbalanced penalization):
+    penalty * (h^2 - h) with h = budget - sum(d)
+
+    It vanishes for h in {0, 1} and is positive otherwise, so it keeps the
+    optimum whenever defending one more cell never hurts the objective, as
+    in the firefighter problem.
+
+    Returns:
+        Tuple of (dense Q over the variables, offset, 0 slack bits)
+    """
+    Q = np.full((num_variables, num_variables), float(penalty))
+    Q[np.diag_indices_from(Q)] -= penalty * (2 * budget - 1)
+    return Q, penalty * (budget ** 2 - budget), 0
+
+
+def domain_wall_penalty(num_variables, budget, penalty):
+    """
+    Penalty for sum(d) <= budget with a domain-wall slack of `budget` bits:
+    penalty * (sum(d) + sum_k b_k - budget)^2 + penalty * sum_k b_{k+1} (1 - b_k)
+
+    All slack coefficients are 1 (no powers of two), and the wall term makes
+    the slack bits a single block of ones, so every slack value has exactly
+    one encoding.
+
+    Returns:
+        Tuple of (dense Q over the variables followed by the slack bits,
+        offset, number of slack bits)
+    """
+    if budget <= 0:
+        return budget_penalty(num_variables, budget, penalty)
+    weights = np.ones(num_variables + budget)
+    Q = penalty * np.outer(weights, weights)
+    Q[np.diag_indices_from(Q)] -= 2 * penalty * budget
+    for k in range(num_variables, num_variables + budget - 1):
+        # Wall term b_{k+1} (1 - b_k)
+        Q[k + 1, k + 1] += penalty
+        Q[k, k + 1] -= penalty
+    return Q, penalty * budget ** 2, budget
+
+
+def _max_gain(Q):
+    """
+    Largest objective decrease from defending one more cell, for any values
+    of the other cells: max_i -(Q_ii + sum_j min(0, Q_ij + Q_ji)).
+    """
+    Q = sp.csr_matrix(Q)
+    couplings = (Q + Q.T).tolil()
+    couplings.setdiag(0)
+    lower = Q.diagonal() + np.asarray(couplings.tocsr().minimum(0).sum(axis=1)).ravel()
+    return float(max(np.max(-lower, initial=0.0), 0.0))
+
+
+def firefighter_formulation(C, budget, risk=None, max_risk=None, variables=None,
+                            fixed_values=None, encoding="binary", risk_encoding="fixing",
+                            alpha=None, beta=None):
+    """
+    Firefighter QUBO with a choice of encodings for the budget and risk constraints.
+
+    Budget sum(d) <= W:
+        'binary': README slack register of floor(log2 W) + 1 bits
+        'unbalanced': no slack bits (see unbalanced_penalty)
+        'domain_wall': W unit-coefficient slack bits (see domain_wall_penalty)
+
+    Risk d_ij * P_ij <= max_risk (R_p - 1 in the README):
+        'fixing': cells above max_risk are not variables (no qubits, no penalty)
+        'linear': beta * d_ij on cells above max_risk (no slack bits)
+        'slack': README slack register of floor(log2 max_risk) + 1 bits per cell
+
+    When alpha or beta is None it is tuned to the smallest weight that still
+    makes every violation cost more than the largest possible objective gain
+    of defending one more cell (10% margin), instead of the much looser
+    sum of |Q|. Smaller weights keep the objective visible to the optimizer.
+
+    Args:
+        C: Sparse couplings over all cells (see coupling_matrix)
+        budget: Number of cells that can still be defended among the variables
+        risk: Flat integer risk levels P of all cells (see risk_levels)
+        max_risk: Largest risk level that can be defended (max_prob - delta)
+        variables: Flat indices of the free cells (all cells if None)
+        fixed_values: Assignment of all cells giving the fixed values
+        encoding: Budget encoding, one of BUDGET_ENCODINGS
+        risk_encoding: Risk encoding, one of RISK_ENCODINGS (ignored without risk)
+        alpha: Budget penalty weight
+        beta: Risk penalty weight
+
+    Returns:
+        dict with 'Q' (scipy CSR over variables, budget slack, then risk slack),
+        'offset', 'variables', 'num_slack', 'num_risk_slack', 'num_qubits',
+        'alpha', 'beta', 'encoding' and 'risk_encoding'
+    """
+    if encoding not in BUDGET_ENCODINGS:
+        raise ValueError(f"Unsupported encoding: {encoding}. Use one of {BUDGET_ENCODINGS}")
+    if risk_encoding not in RISK_ENCODINGS:
+        raise ValueError(f"Unsupported risk_encoding: {risk_encoding}. "
+                         f"Use one of {RISK_ENCODINGS}")
+    if risk is not None and max_risk is None:
+        raise ValueError("max_risk is required when risk is given")
+
+    Q, offset = firefighter_objective(C)
+    n = Q.shape[0]
+    variables = np.arange(n) if variables is None else np.asarray(variables, dtype=np.int64)
+    fixed_values = np.zeros(n) if fixed_values is None else fixed_values
+    if risk is None:
+        risk_encoding = None
+    else:
+        risk = np.asarray(risk).ravel()
+        if risk_encoding == "fixing":
+            variables = variables[risk[variables] <= max_risk]
+    Q, offset = restrict_qubo(Q, variables, fixed_values, offset)
+    num_variables = len(variables)
+
+    gain = _max_gain(Q)
+    if alpha is None:
+        # Violating by v cells costs at least alpha * v (unbalanced: 2 * alpha * v)
+        alpha = 1.1 * gain / (2 if encoding == "unbalanced" else 1) or 1.0
+    if beta is None:
+        beta = 1.1 * gain or 1.0
+
+    if encoding == "binary":
+        Q_budget, budget_offset, num_slack = budget_penalty(num_variables, budget, alpha)
+    elif encoding == "unbalanced":
+        Q_budget, budget_offset, num_slack = unbalanced_penalty(num_variables, budget, alpha)
+    else:
+        Q_budget, budget_offset, num_slack = domain_wall_penalty(num_variables, budget, alpha)
+
+    # Risk penalty terms as (row, col, value) in the full index space
+    rows, cols, values = [], [], []
+    risk_offset = 0.0
+    num_risk_slack = 0
+    if risk_encoding == "linear":
+        violating = np.flatnonzero(risk[variables] > max_risk)
+        rows, cols, values = list(violating), list(violating), [beta] * len(violating)
+    elif risk_encoding == "slack":
+        weights = slack_weights(max_risk)
+        next_bit = num_variables + num_slack
+        for k, level in enumerate(risk[variables]):
+            # beta * (P_k d_k + sum_b w_b A_kb - max_risk)^2
+            index = np.concatenate([[k], next_bit + np.arange(len(weights))])
+            u = np.concatenate([[level], weights])
+            block = beta * np.outer(u, u)
+            block[np.diag_indices_from(block)] -= 2 * beta * max_risk * u
+            rows.extend(np.repeat(index, len(index)))
+            cols.extend(np.tile(index, len(index)))
+            values.extend(block.ravel())
+            next_bit += len(weights)
+            risk_offset += beta * max_risk ** 2
+        num_risk_slack = next_bit - num_variables - num_slack
+
+    size = num_variables + num_slack + num_risk_slack
+    Q = (sp.csr_matrix((Q.data, Q.indices, Q.indptr), shape=(num_variables, size))
+         if num_variables else sp.csr_matrix((0, size)))
+    Q = sp.vstack([Q, sp.csr_matrix((size - num_variables, size))]).tocsr()
+    Q_budget = sp.coo_matrix(Q_budget)
+    Q = Q + sp.csr_matrix((Q_budget.data, (Q_budget.row, Q_budget.col)), shape=(size, size))
+    Q = Q + sp.csr_matrix((values, (rows, cols)), shape=(size, size))
+    return {
+        "Q": Q.tocsr(),
+        "offset": offset + budget_offset + risk_offset,
+        "variables": variables,
+        "num_slack": num_slack,
+        "num_risk_slack": num_risk_slack,
+        "num_qubits": size,
+        "alpha": alpha,
+        "beta": beta if risk_encoding in ["linear", "slack"] else None,
+        "encoding": encoding,
+        "risk_encoding": risk_encoding,
+    }
+
+
+def compare_formulations(C, budget, risk=None, max_risk=None, variables=None,
+                         encodings=None, risk_encodings=None):
+    """
+    Qubit counts and tuned penalty weights of every encoding combination.
+
+    Args:
+        C, budget, risk, max_risk, variables: As for firefighter_formulation
+        encodings: Budget encodings to compare (all if None)
+        risk_encodings: Risk encodings to compare (all if None)
+
+    Returns:
+        List of dicts with 'encoding', 'risk_encoding', 'num_qubits',
+        'num_variables', 'num_slack', 'num_risk_slack', 'alpha' and 'beta'
+    """
+    encodings = BUDGET_ENCODINGS if encodings is None else encodings
+    risk_encodings = [None] if risk is None else (
+        RISK_ENCODINGS if risk_encodings is None else risk_encodings)
+
+    report = []
+    for encoding in encodings:
+        for risk_encoding in risk_encodings:
+            formulation = firefighter_formulation(
+                C, budget, risk, max_risk, variables, encoding=encoding,
+                risk_encoding=risk_encoding or "fixing")
+            entry = {key: formulation[key] for key in
+                     ["encoding", "risk_encoding", "num_qubits", "num_slack",
+                      "num_risk_slack", "alpha", "beta"]}
+            entry["num_variables"] = len(formulation["variables"])
+            report.append(entry)
+            beta = "-" if entry["beta"] is None else f"{entry['beta']:.4g}"
+            print(f"{encoding:>12} / {str(entry['risk_encoding']):>7}: "
+                  f"{entry['num_qubits']} qubits ({entry['num_variables']} cells, "
+                  f"{entry['num_slack']} budget slack, {entry['num_risk_slack']} risk slack), "
+                  f"alpha={entry['alpha']:.4g}, beta={beta}")
+    return report
+
+
+def firefighter_qubo(C, budget, variables=None, fixed_values=None, penalty=None):
+    """
+    Firefighter QUBO over a set of defense variables.
+
+    Cells that are not variables keep their value in fixed_values (undefended
+    by default). The budget sum(d) <= W applies to the variables, using slack
+    bits after them.
+
+    Args:
+        C: Sparse couplings over all cells (see coupling_matrix)
+        budget: Number of cells that can still be defended among the variables
+        variables: Flat indices of the free cells (all cells if None)
+        fixed_values: Assignment of all cells giving the fixed values
+        penalty: Budget penalty weight (sum of |Q| + 1 if None, which always
+                 exceeds any objective gain from breaking the budget)
+
+    Returns:
+        dict with 'Q' (scipy CSR over variables + slack), 'offset',
+        'variables', 'num_slack' and 'penalty'
+    """
+    Q, offset = firefighter_objective(C)
+    n = Q.shape[0]
+    variables = np.arange(n) if variables is None else np.asarray(variables, dtype=np.int64)
+    fixed_values = np.zeros(n) if fixed_values is None else fixed_values
+    Q, offset = restrict_qubo(Q, variables, fixed_values, offset)
+
+    if penalty is None:
+        penalty = float(abs(Q).sum()) + 1.0
+    Q_penalty, penalty_offset, num_slack = budget_penalty(len(variables), budget, penalty)
+    size = len(variables) + num_slack
+    Q = sp.csr_matrix((Q.data, Q.indices, Q.indptr), shape=(len(variables), size))
+    Q = sp.vstack([Q, sp.csr_matrix((num_slack, size))]).tocsr() + sp.csr_matrix(Q_penalty)
+    return {
+        "Q": Q,
+        "offset": offset + penalty_offset,
+        "variables": variables,
+        "num_slack": num_slack,
+        "penalty": penalty,
+    }
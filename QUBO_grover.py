@@ -0,0 +1,247 @@
+import time
+
+import numpy as np
+
+from QUBO_exact import qubo_energy_table
+
+
+class GroverAdaptiveSearch:
+    """
+    NumPy simulator of Grover Adaptive Search (GAS) for QUBO problems.
+
+    The energies x^T Q x + offset of all 2^n assignments are computed once.
+    Each Grover iteration for a threshold y is then a phase flip of the
+    amplitudes with energy below y followed by the reflection about the
+    uniform state, both vectorized over the state vector, instead of
+    synthesizing and simulating oracle circuits as GroverOptimizer does.
+
+    The threshold is updated with the adaptive schedule of Bulger, Baritompa
+    and Wood, as in qiskit_optimization.GroverOptimizer: the number of
+    rotations is drawn uniformly from 0..m-1, where the integer bound m
+    starts at 1, becomes ceil(min(m * lam, sqrt(2^n))) after every
+    measurement without improvement and is reset to 1 on improvement. The
+    search stops after num_iterations such measurements in a row.
+    """
+
+    def __init__(self, Q, offset=0.0, max_qubits=26):
+        """
+        Initialize the simulator.
+
+        Args:
+            Q: QUBO matrix, dense numpy array or scipy sparse matrix/array
+            offset: Constant of the QUBO
+            max_qubits: Largest problem accepted (the state takes 2^n floats)
+        """
+        n = np.shape(Q)[0]
+        if n > max_qubits:
+            raise ValueError(f"{n} variables exceed max_qubits={max_qubits}")
+        self._n = n
+        self._energies = qubo_energy_table(Q, offset)
+
+    @property
+    def num_qubits(self):
+        return self._n
+
+    @property
+    def energies(self):
+        return self._energies
+
+    def amplify(self, threshold, rotations, simulation="statevector"):
+        """
+        Measurement probabilities after Grover iterations from the uniform state.
+
+        Args:
+            threshold: Energies strictly below it are marked by the oracle
+            rotations: Number of Grover iterations
+            simulation: 'statevector' applies every phase flip and reflection;
+                        'subspace' uses that all marked (and all unmarked)
+                        amplitudes stay equal, giving the same distribution
+                        in O(2^n) regardless of the number of rotations
+
+        Returns:
+            numpy array of length 2^n with the probabilities
+        """
+        marked = self._energies < threshold
+        size = len(self._energies)
+        if simulation == "statevector":
+            state = np.full(size, 1 / np.sqrt(size))
+            for _ in range(rotations):
+                state[marked] *= -1
+                state = 2 * state.mean() - state
+            return state ** 2
+        if simulation == "subspace":
+            num_marked = int(marked.sum())
+            if num_marked in [0, size]:
+                return np.full(size, 1 / size)
+            theta = np.arcsin(np.sqrt(num_marked / size))
+            good = np.sin((2 * rotations + 1) * theta) ** 2
+            return np.where(marked, good / num_marked, (1 - good) / (size - num_marked))
+        raise ValueError(f"Unsupported simulation: {simulation}. Use 'statevector' or 'subspace'")
+
+    def solve(self, num_iterations=10, lam=8 / 7, seed=None, top_k=10,
+              simulation="statevector"):
+        """
+        Run Grover Adaptive Search.
+
+        Args:
+            num_iterations: Measurements without improvement before stopping
+            lam: Growth factor of the rotation bound
+            seed: Random seed (threshold start, rotation counts and measurements)
+            top_k: Number of best distinct measured assignments returned
+            simulation: 'statevector' or 'subspace' (see amplify)
+
+        Returns:
+            dict with 'best_x', 'best_energy', 'samples' and 'energies' (the
+            top_k distinct measured assignments, lowest first), 'time',
+            'history' (threshold after each improvement), 'rotations' (total
+            Grover iterations, i.e. oracle calls) and 'measurements'
+        """
+        start = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        size = len(self._energies)
+        max_bound = 2 ** (self._n / 2)
+
+        # The first measurement is of the uniform state (no rotations)
+        best = int(rng.integers(size))
+        threshold = self._energies[best]
+        history = [float(threshold)]
+        measured = {best}
+        rotations = 0
+        measurements = 1
+
+        bound = 1
+        failures = 0
+        while failures < num_iterations:
+            count = int(rng.integers(0, bound))
+            probabilities = self.amplify(threshold, count, simulation)
+            outcome = int(np.searchsorted(np.cumsum(probabilities),
+                                          rng.random() * probabilities.sum()))
+            outcome = min(outcome, size - 1)
+            rotations += count
+            measurements += 1
+            measured.add(outcome)
+
+            if self._energies[outcome] < threshold:
+                best, threshold = outcome, self._energies[outcome]
+                history.append(float(threshold))
+                bound = 1
+                failures = 0
+            else:
+                bound = int(np.ceil(min(bound * lam, max_bound)))
+                failures += 1
+
+        measured = np.array(sorted(measured))
+        order = np.argsort(self._energies[measured], kind="stable")[:top_k]
+        samples = (measured[order][:, None] >> np.arange(self._n)) & 1
+        return {
+            "best_x": samples[0],
+            "best_energy": float(self._energies[best]),
+            "samples": samples,
+            "energies": self._energies[measured[order]],
+            "time": time.perf_counter() - start,
+            "history": history,
+            "rotations": rotations,
+            "measurements": measurements,
+        }
+
+
+def solve_qubo_grover(Q, offset=0.0, num_iterations=10, seed=None, top_k=10,
+                      simulation="statevector"):
+    """
+    Solve a QUBO with the Grover Adaptive Search simulator.
+
+    Args:
+        Q: QUBO matrix, dense numpy array or scipy sparse matrix/array
+        offset: Constant of the QUBO
+        num_iterations, seed, top_k, simulation: See GroverAdaptiveSearch.solve
+
+    Returns:
+        dict as for GroverAdaptiveSearch.solve
+    """
+    return GroverAdaptiveSearch(Q, offset).solve(num_iterations, seed=seed, top_k=top_k,
+                                                 simulation=simulation)
+
+
+class GroverOptimizer:
+    """
+    Drop-in replacement for qiskit_optimization.algorithms.GroverOptimizer
+    backed by the GroverAdaptiveSearch simulator.
+
+    The QuadraticProgram is converted to a QUBO as GroverOptimizer does
+    (QuadraticProgramToQubo by default) and solved with the simulator, which
+    evaluates the QUBO exactly: num_value_qubits, sampler and pass_manager are
+    accepted for compatibility but unused. qiskit_optimization is only needed
+    to call solve().
+    """
+
+    def __init__(self, num_value_qubits=None, num_iterations=3, converters=None, penalty=None,
+                 sampler=None, pass_manager=None, seed=None, top_k=10,
+                 simulation="statevector"):
+        """
+        Initialize the optimizer.
+
+        Args:
+            num_value_qubits: Ignored (energies are computed exactly)
+            num_iterations: Measurements without improvement before stopping
+            converters: qiskit_optimization converter(s) from the problem to a
+                        QUBO (QuadraticProgramToQubo(penalty) if None)
+            penalty: Penalty factor of the default converter
+            sampler, pass_manager: Ignored (the search is simulated)
+            seed: Random seed of the search
+            top_k: Number of best distinct measured assignments in samples
+            simulation: 'statevector' or 'subspace' (see GroverAdaptiveSearch.amplify)
+        """
+        self._num_iterations = num_iterations
+        self._converters = converters
+        self._penalty = penalty
+        self._seed = seed
+        self._top_k = top_k
+        self._simulation = simulation
+
+    def solve(self, problem):
+        """
+        Solve a QuadraticProgram.
+
+        Args:
+            problem: qiskit_optimization QuadraticProgram
+
+        Returns:
+            qiskit_optimization OptimizationResult with x, fval, status and
+            samples (the distinct measured assignments, best first, with
+            equal probabilities)
+        """
+        # Imported here so the simulator does not need qiskit_optimization
+        from qiskit_optimization.algorithms import (OptimizationResult,
+                                                    OptimizationResultStatus, SolutionSample)
+        from qiskit_optimization.converters import QuadraticProgramToQubo
+
+        converters = self._converters
+        if converters is None:
+            converters = [QuadraticProgramToQubo(penalty=self._penalty)]
+        elif not isinstance(converters, list):
+            converters = [converters]
+        qubo = problem
+        for converter in converters:
+            qubo = converter.convert(qubo)
+
+        # x^T Q x + offset with the linear terms on the diagonal, minimized
+        sign = qubo.objective.sense.value
+        Q = sign * (qubo.objective.quadratic.to_array()
+                    + np.diag(qubo.objective.linear.to_array()))
+        result = GroverAdaptiveSearch(Q, sign * qubo.objective.constant).solve(
+            self._num_iterations, seed=self._seed, top_k=self._top_k,
+            simulation=self._simulation
+        )
+
+        samples = []
+        for x in result["samples"]:
+            for converter in converters[::-1]:
+                x = converter.interpret(x)
+            status = (OptimizationResultStatus.SUCCESS if problem.is_feasible(x)
+                      else OptimizationResultStatus.INFEASIBLE)
+            samples.append(SolutionSample(x=np.asarray(x), fval=problem.objective.evaluate(x),
+                                          probability=1 / len(result["samples"]),
+                                          status=status))
+        best = samples[0]
+        return OptimizationResult(x=best.x, fval=best.fval, variables=problem.variables,
+                                  status=best.status, samples=samples)
@@ -0,0 +1,143 @@
+import numpy as np
+import scipy.sparse as sp
+from qiskit.quantum_info import SparsePauliOp, PauliList
+
+
+def qubo_to_ising(Q):
+    """
+    Ising coefficients of a QUBO, computed with array operations in O(nnz).
+
+    QUBO: minimize x^T Q x, x in {0,1}^n. With x_i = (1 - z_i)/2:
+    x^T Q x = offset + sum_i h_i z_i + sum_{i<j} J_ij z_i z_j
+
+    Args:
+        Q: QUBO matrix, dense numpy array or scipy sparse matrix/array
+           (need not be symmetric or triangular)
+
+    Returns:
+        Tuple of (h, rows, cols, J, offset): linear coefficients of length n,
+        the i < j index arrays and coefficients of the nonzero couplings, and
+        the constant offset
+    """
+    if Q.ndim != 2 or Q.shape[0] != Q.shape[1]:
+        raise ValueError("Q must be a square matrix")
+    n = Q.shape[0]
+
+    Q = sp.coo_matrix(Q)
+    diagonal = Q.row == Q.col
+    linear = np.bincount(Q.row[diagonal], weights=Q.data[diagonal], minlength=n)
+
+    # Fold Q_ij and Q_ji into one upper-triangular coupling W_ij (duplicates summed)
+    off = ~diagonal
+    upper = sp.coo_matrix((Q.data[off], (np.minimum(Q.row[off], Q.col[off]),
+                                         np.maximum(Q.row[off], Q.col[off]))),
+                          shape=(n, n)).tocsr()
+    upper.eliminate_zeros()
+    upper = upper.tocoo()
+    rows, cols, weights = upper.row, upper.col, upper.data
+
+    h = -linear / 2 - (np.bincount(rows, weights=weights, minlength=n)
+                       + np.bincount(cols, weights=weights, minlength=n)) / 4
+    J = weights / 4
+    offset = float(linear.sum() / 2 + weights.sum() / 4)
+    return h, rows, cols, J, offset
+
+
+def ising_to_sparse_pauli_op(h, rows, cols, J, bitstring_order=True):
+    """
+    Build a SparsePauliOp from Ising coefficients without Pauli label strings.
+
+    Args:
+        h: Linear coefficients, length n
+        rows, cols: Index arrays of the couplings
+        J: Coupling coefficients
+        bitstring_order: If True, variable i acts on qubit n-1-i, so that
+                         measured bitstrings read left to right give x_0..x_{n-1}
+                         (the convention of qubo_to_ising_hamiltonian in
+                         QUBO_test.ipynb); if False, variable i acts on qubit i
+
+    Returns:
+        SparsePauliOp with Z and ZZ terms (no identity term)
+    """
+    h = np.asarray(h, dtype=float)
+    n = len(h)
+    linear = np.flatnonzero(h)
+    num_terms = len(linear) + len(J)
+    if num_terms == 0:
+        return SparsePauliOp("I" * n, coeffs=[0.0])
+
+    qubit = (lambda index: n - 1 - index) if bitstring_order else (lambda index: index)
+    z = np.zeros((num_terms, n), dtype=bool)
+    z[np.arange(len(linear)), qubit(linear)] = True
+    pairs = np.arange(len(linear), num_terms)
+    z[pairs, qubit(np.asarray(rows))] = True
+    z[pairs, qubit(np.asarray(cols))] = True
+
+    paulis = PauliList.from_symplectic(z, np.zeros_like(z))
+    coeffs = np.concatenate([h[linear], np.asarray(J, dtype=float)])
+    return SparsePauliOp(paulis, coeffs=coeffs, copy=False)
+
+
+def qubo_to_ising_hamiltonian(Q, bitstring_order=True):
+    """
+    Convert a QUBO matrix to an Ising Hamiltonian and constant offset.
+
+    Vectorized replacement for the loop-based converter in QUBO_test.ipynb:
+    the energy of a basis state plus the offset equals x^T Q x.
+
+    Args:
+        Q: QUBO matrix, dense numpy array or scipy sparse matrix/array
+        bitstring_order: Qubit ordering, see ising_to_sparse_pauli_op
+
+    Returns:
+        Tuple of (SparsePauliOp, offset)
+    """
+    h, rows, cols, J, offset = qubo_to_ising(Q)
+    return ising_to_sparse_pauli_op(h, rows, cols, J, bitstring_order), offset
+
+
+def qubo_energy(Q, x, offset=0.0):
+    """
+    Energies x^T Q x + offset of one or more assignments.
+
+    Args:
+        Q: QUBO matrix, dense numpy array or scipy sparse matrix/array
+        x: Assignment of length n, or array of shape (batch, n)
+        offset: Constant added to the energies
+
+    Returns:
+        float for a single assignment, numpy array for a batch
+    """
+    X = np.atleast_2d(np.asarray(x, dtype=float))
+    energies = np.sum(X * np.asarray((Q @ X.T).T), axis=1) + offset
+    return float(energies[0]) if np.ndim(x) == 1 else energies
+
+
+def restrict_qubo(Q, variables, fixed_values, offset=0.0):
+    """
+    Sub-QUBO over some variables with all the others fixed.
+
+    Couplings to fixed variables become linear (diagonal) terms and the
+    energy of the fixed part moves to the offset, so that
+    y^T Q_sub y + offset_sub equals the full energy with x[variables] = y.
+
+    Args:
+        Q: QUBO matrix (n x n), dense or sparse
+        variables: Indices of the free variables
+        fixed_values: Full-length assignment giving the values of the others
+        offset: Constant of the full QUBO
+
+    Returns:
+        Tuple of (scipy CSR sub-QUBO, offset)
+    """
+    Q = sp.csr_matrix(Q)
+    n = Q.shape[0]
+    variables = np.asarray(variables, dtype=np.int64)
+    free = np.zeros(n, dtype=bool)
+    free[variables] = True
+    fixed = np.where(free, 0.0, np.asarray(fixed_values, dtype=float))
+
+    sub = Q[variables][:, variables]
+    linear = (Q @ fixed)[variables] + (Q.T @ fixed)[variables]
+    sub = (sub + sp.diags(linear)).tocsr()
+    return sub, float(offset + fixed @ (Q @ fixed))
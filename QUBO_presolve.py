@@ -0,0 +1,282 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+from scipy.sparse.csgraph import connected_components
+
+from QUBO_exact import solve_qubo_exact
+
+
+def _linear_and_couplings(Q):
+    """Split Q into linear terms a and symmetric zero-diagonal couplings W."""
+    Q = sp.csr_matrix(Q)
+    couplings = (Q + Q.T).tolil()
+    couplings.setdiag(0)
+    couplings = couplings.tocsr()
+    couplings.eliminate_zeros()
+    return Q.diagonal(), couplings
+
+
+def _bound_fixing(a, W):
+    """
+    First-order persistencies: the gain of setting x_i = 1 is
+    a_i + sum_j W_ij x_j, which is bounded by the signs of the couplings.
+
+    Returns:
+        dict variable -> fixed value
+    """
+    lower = a + np.asarray(W.minimum(0).sum(axis=1)).ravel()
+    upper = a + np.asarray(W.maximum(0).sum(axis=1)).ravel()
+    fixed = {int(i): 0 for i in np.flatnonzero(lower >= 0)}
+    fixed.update({int(i): 1 for i in np.flatnonzero(upper <= 0) if int(i) not in fixed})
+    return fixed
+
+
+def _equal_pairs(a, W):
+    """
+    Pairs (i, j) with an optimum where x_i = x_j: the coupling is negative
+    enough that x_i != x_j never beats setting both to the same value.
+
+    Returns:
+        List of disjoint (keep, merge) pairs
+    """
+    upper = a + np.asarray(W.maximum(0).sum(axis=1)).ravel()
+    coo = sp.triu(W, k=1).tocoo()
+    pairs, used = [], set()
+    for i, j, w in zip(coo.row, coo.col, coo.data):
+        # Upper bounds of both gains excluding the pair's own coupling (w < 0)
+        if w < 0 and w <= -max(upper[i], upper[j]) and i not in used and j not in used:
+            pairs.append((int(i), int(j)))
+            used.update((i, j))
+    return pairs
+
+
+def _roof_duality(a, W):
+    """
+    Persistencies from the roof dual, solved as the standard linearization LP.
+
+    Its vertices are half-integral and the integral components of an optimal
+    vertex can be fixed together (weak persistency, Hammer, Hansen and
+    Simeone 1984). Solved with the HiGHS dual simplex so a vertex is returned.
+
+    Returns:
+        dict variable -> fixed value
+    """
+    m = len(a)
+    edges = sp.triu(W, k=1).tocoo()
+    k = len(edges.data)
+    if k == 0:
+        return {}
+
+    rows, cols, values, rhs = [], [], [], []
+    constraint = 0
+    for e, (i, j, w) in enumerate(zip(edges.row, edges.col, edges.data)):
+        y = m + e
+        if w < 0:
+            # y <= x_i and y <= x_j
+            for x in (i, j):
+                rows += [constraint, constraint]
+                cols += [y, x]
+                values += [1.0, -1.0]
+                rhs.append(0.0)
+                constraint += 1
+        else:
+            # y >= x_i + x_j - 1
+            rows += [constraint] * 3
+            cols += [i, j, y]
+            values += [1.0, 1.0, -1.0]
+            rhs.append(1.0)
+            constraint += 1
+
+    A = sp.csr_matrix((values, (rows, cols)), shape=(constraint, m + k))
+    result = linprog(np.concatenate([a, edges.data]), A_ub=A, b_ub=rhs,
+                     bounds=(0, 1), method="highs-ds")
+    if result.status != 0:
+        return {}
+    x = result.x[:m]
+    fixed = {int(i): 0 for i in np.flatnonzero(x < 1e-9)}
+    fixed.update({int(i): 1 for i in np.flatnonzero(x > 1 - 1e-9)})
+    return fixed
+
+
+class PresolvedQUBO:
+    """
+    A reduced QUBO and the affine map back to the original variables.
+
+    The original assignment is x = P y + c for a reduced assignment y, and
+    y^T Q y + offset equals x^T Q_original x + offset_original.
+    """
+
+    def __init__(self, Q, offset, P, c, stats):
+        self._Q = Q
+        self._offset = offset
+        self._P = P
+        self._c = c
+        self._stats = stats
+
+    @property
+    def Q(self):
+        return self._Q
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @property
+    def num_variables(self):
+        return self._Q.shape[0]
+
+    @property
+    def stats(self):
+        return dict(self._stats)
+
+    @property
+    def variables(self):
+        """Original index of the representative of each reduced variable."""
+        return np.asarray(self._P.argmax(axis=0)).ravel()
+
+    def expand(self, y):
+        """
+        Map a reduced assignment (or a batch of them) to the original variables.
+
+        Args:
+            y: Assignment of length num_variables, or array of shape (batch, num_variables)
+
+        Returns:
+            numpy integer array with the full assignment(s)
+        """
+        y = np.asarray(y, dtype=float)
+        if y.ndim == 1:
+            return np.rint(self._P @ y + self._c).astype(int)
+        return np.rint((self._P @ y.T).T + self._c).astype(int)
+
+
+def _apply(Q, offset, P, c, fixed, merges):
+    """Substitute fixed and merged variables and compose the variable map."""
+    m = Q.shape[0]
+    keep = np.ones(m, dtype=bool)
+    for variable in fixed:
+        keep[variable] = False
+    for _, merged in merges:
+        keep[merged] = False
+
+    column = np.cumsum(keep) - 1
+    rows = list(np.flatnonzero(keep))
+    cols = list(column[keep])
+    for kept, merged in merges:
+        rows.append(merged)
+        cols.append(column[kept])
+    step_P = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(m, int(keep.sum())))
+    step_c = np.zeros(m)
+    for variable, value in fixed.items():
+        step_c[variable] = value
+
+    # (P y + c)^T Q (P y + c) with binary y: linear terms move to the diagonal
+    linear = step_P.T @ ((Q + Q.T) @ step_c)
+    Q_new = (step_P.T @ Q @ step_P + sp.diags(linear)).tocsr()
+    offset = offset + float(step_c @ (Q @ step_c))
+    return Q_new, offset, (P @ step_P).tocsr(), P @ step_c + c
+
+
+def presolve_qubo(Q, offset=0.0, roof_duality=True, merge=True, exact_component_size=10):
+    """
+    Reduce a QUBO before solving it.
+
+    Repeats until nothing changes: first-order persistencies (variables whose
+    best value does not depend on the others), merging pairs that are equal
+    in an optimum, and roof-duality persistencies. Connected components of
+    the coupling graph with at most `exact_component_size` variables are
+    then solved exactly and fixed. Every reduction keeps at least one
+    optimum of the original problem.
+
+    Args:
+        Q: QUBO matrix, dense numpy array or scipy sparse matrix/array
+        offset: Constant of the QUBO
+        roof_duality: Apply roof-duality persistencies (one LP per round)
+        merge: Merge equal variable pairs
+        exact_component_size: Largest independent component solved exactly (0 = none)
+
+    Returns:
+        PresolvedQUBO
+    """
+    Q = sp.csr_matrix(Q, dtype=float)
+    n = Q.shape[0]
+    P = sp.identity(n, format="csr")
+    c = np.zeros(n)
+    stats = {"original": n, "fixed_bounds": 0, "fixed_roof_duality": 0, "merged": 0,
+             "fixed_components": 0}
+
+    while Q.shape[0] > 0:
+        a, W = _linear_and_couplings(Q)
+        fixed = _bound_fixing(a, W)
+        if fixed:
+            stats["fixed_bounds"] += len(fixed)
+            Q, offset, P, c = _apply(Q, offset, P, c, fixed, [])
+            continue
+        merges = _equal_pairs(a, W) if merge else []
+        if merges:
+            stats["merged"] += len(merges)
+            Q, offset, P, c = _apply(Q, offset, P, c, {}, merges)
+            continue
+        fixed = _roof_duality(a, W) if roof_duality else {}
+        if fixed:
+            stats["fixed_roof_duality"] += len(fixed)
+            Q, offset, P, c = _apply(Q, offset, P, c, fixed, [])
+            continue
+        break
+
+    if exact_component_size > 0 and Q.shape[0] > 0:
+        _, W = _linear_and_couplings(Q)
+        _, labels = connected_components(W, directed=False)
+        fixed = {}
+        for label in np.unique(labels):
+            members = np.flatnonzero(labels == label)
+            if len(members) <= exact_component_size:
+                best = solve_qubo_exact(Q[members][:, members], top_k=1)["best_x"]
+                fixed.update({int(v): int(value) for v, value in zip(members, best)})
+        if fixed:
+            stats["fixed_components"] += len(fixed)
+            Q, offset, P, c = _apply(Q, offset, P, c, fixed, [])
+
+    stats["reduced"] = Q.shape[0]
+    return PresolvedQUBO(Q, offset, P, c, stats)
+
+
+def presolve_firefighter(C, defendable=None, burning=None):
+    """
+    Firefighter-specific variable fixing before the QUBO is built.
+
+    Cells are fixed undefended when they are burning (S0), when the risk
+    constraint forbids defending them, or when they have no coupling to the
+    frontier set S (defending them only spends budget). Fixing cells to zero
+    never violates the budget, so these fixings are always safe.
+
+    Args:
+        C: Sparse couplings over all cells (see coupling_matrix)
+        defendable: Flat boolean mask of cells allowed by the risk constraint
+        burning: Flat indices of the burning cells S0
+
+    Returns:
+        dict with 'variables' (flat indices of the free cells) and the number
+        of cells fixed for each reason
+    """
+    C = sp.csr_matrix(C)
+    n = C.shape[0]
+    free = np.ones(n, dtype=bool)
+
+    burning_mask = np.zeros(n, dtype=bool)
+    if burning is not None:
+        burning_mask[np.asarray(burning, dtype=np.int64)] = True
+    risk_mask = np.zeros(n, dtype=bool) if defendable is None else ~np.asarray(defendable)
+    coupled = (np.diff(C.indptr) > 0) | (np.diff(C.tocsc().indptr) > 0)
+
+    free &= ~burning_mask
+    fixed_risk = free & risk_mask
+    free &= ~risk_mask
+    fixed_uncoupled = free & ~coupled
+    free &= coupled
+    return {
+        "variables": np.flatnonzero(free),
+        "fixed_burning": int(burning_mask.sum()),
+        "fixed_risk": int(fixed_risk.sum()),
+        "fixed_uncoupled": int(fixed_uncoupled.sum()),
+    }
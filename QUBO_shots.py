@@ -0,0 +1,147 @@
+import math
+
+
+class ShotSchedule:
+    """
+    Adaptive precision schedule for estimator-based VQE.
+
+    Optimizations start with cheap, low-precision evaluations. After every
+    window of evaluations the best cost is compared with the previous window;
+    when the improvement falls below `tolerance` times the current standard
+    error, the precision is tightened by `factor` until `final_precision`.
+    Shots are accounted as ceil(1 / precision^2) per evaluation, the
+    convention used by the IBM runtime estimator.
+
+    The schedule only sets estimator precision. Sampler runs (e.g.
+    VQESolver.sample_circuit) keep their explicit shot count; those shots are
+    recorded against the budget with record() but are not scheduled.
+    """
+
+    def __init__(self, initial_precision=0.05, final_precision=0.005, factor=0.5,
+                 window=20, tolerance=1.0, max_shots=None):
+        """
+        Initialize the schedule.
+
+        Args:
+            initial_precision: Target standard error of the first evaluations
+            final_precision: Tightest precision the schedule will reach
+            factor: Multiplier applied to the precision at each tightening
+            window: Number of evaluations between convergence checks
+            tolerance: Tighten when the windowed improvement is below
+                       tolerance * precision
+            max_shots: Total shot budget (unlimited if None)
+        """
+        if not 0 < factor < 1:
+            raise ValueError("factor must be between 0 and 1")
+        if final_precision > initial_precision:
+            raise ValueError("final_precision must not exceed initial_precision")
+
+        self._initial_precision = initial_precision
+        self._final_precision = final_precision
+        self._factor = factor
+        self._window = window
+        self._tolerance = tolerance
+        self._max_shots = max_shots
+        self.reset()
+
+    def reset(self):
+        """Restart the schedule and the shot accounting."""
+        self._precision = self._initial_precision
+        self._total_shots = 0
+        self._evaluations = 0
+        self._window_costs = []
+        self._previous_best = None
+        self._history = [(0, self._precision)]
+
+    @property
+    def precision(self):
+        return self._precision
+
+    @property
+    def shots(self):
+        """Shots per evaluation at the current precision."""
+        return math.ceil(1 / self._precision ** 2)
+
+    @property
+    def total_shots(self):
+        return self._total_shots
+
+    @property
+    def remaining_shots(self):
+        if self._max_shots is None:
+            return None
+        return max(self._max_shots - self._total_shots, 0)
+
+    def exhausted(self):
+        """Whether the shot budget has been used up."""
+        return self._max_shots is not None and self._total_shots >= self._max_shots
+
+    def record(self, num_evaluations, shots=None):
+        """
+        Account for evaluations run at the current (or a given) shot count.
+
+        Args:
+            num_evaluations: Number of circuits/parameter sets evaluated
+            shots: Shots per evaluation (current schedule value if None)
+        """
+        self._total_shots += num_evaluations * (self.shots if shots is None else shots)
+        self._evaluations += num_evaluations
+
+    def update(self, costs):
+        """
+        Feed evaluated costs and tighten the precision when progress stalls.
+
+        Args:
+            costs: Iterable of evaluated costs
+        """
+        self._window_costs.extend(costs)
+        if len(self._window_costs) < self._window:
+            return
+
+        best = min(self._window_costs)
+        self._window_costs = []
+        if self._previous_best is not None and self._precision > self._final_precision:
+            improvement = self._previous_best - best
+            if improvement < self._tolerance * self._precision:
+                self._precision = max(self._precision * self._factor, self._final_precision)
+                self._history.append((self._evaluations, self._precision))
+        self._previous_best = best if self._previous_best is None else min(best, self._previous_best)
+
+    def report(self):
+        """
+        Summary of the shots spent.
+
+        Returns:
+            dict with total shots, evaluations, remaining budget, current
+            precision and the (evaluation, precision) tightening history
+        """
+        return {
+            "total_shots": self._total_shots,
+            "evaluations": self._evaluations,
+            "max_shots": self._max_shots,
+            "remaining_shots": self.remaining_shots,
+            "precision": self._precision,
+            "shots_per_evaluation": self.shots,
+            "mean_shots_per_evaluation": (self._total_shots / self._evaluations
+                                          if self._evaluations else 0.0),
+            "history": list(self._history),
+        }
+
+    def state(self):
+        """Accounting state of the schedule, for checkpoints."""
+        return {
+            "precision": self._precision,
+            "total_shots": self._total_shots,
+            "evaluations": self._evaluations,
+            "previous_best": self._previous_best,
+            "history": [list(entry) for entry in self._history],
+        }
+
+    def set_state(self, state):
+        """Restore the accounting state saved by state()."""
+        self._precision = state["precision"]
+        self._total_shots = state["total_shots"]
+        self._evaluations = state["evaluations"]
+        self._previous_best = state["previous_best"]
+        self._window_costs = []
+        self._history = [tuple(entry) for entry in state["history"]]
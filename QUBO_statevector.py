@@ -0,0 +1,314 @@
+import numpy as np
+from qiskit.circuit import Parameter, ParameterExpression
+
+
+# Gates whose (first) angle is bound per parameter set
+PARAMETRIC_GATES = ["rx", "ry", "rz", "p", "u1", "r"]
+
+# Two-qubit gates applied as amplitude swaps or sign flips
+TWO_QUBIT_GATES = ["cx", "cz", "swap"]
+
+# Gates with no effect on the state vector
+IGNORED_GATES = ["barrier", "id", "delay"]
+
+
+def diagonal_energies(hamiltonian):
+    """
+    Precompute the diagonal of a Z-only (QUBO/Ising) Hamiltonian.
+
+    Uses a fast Walsh-Hadamard transform over the Pauli Z masks, so the cost
+    is O(n * 2^n) regardless of the number of terms.
+
+    Args:
+        hamiltonian: SparsePauliOp containing only I and Z terms
+
+    Returns:
+        numpy array of length 2^n with the energy of every basis state
+        (qiskit little-endian ordering)
+    """
+    if np.any(hamiltonian.paulis.x):
+        raise ValueError("Hamiltonian must be diagonal (only I and Z terms)")
+    if np.any(np.abs(np.imag(hamiltonian.coeffs)) > 1e-12):
+        raise ValueError("Hamiltonian coefficients must be real")
+
+    n = hamiltonian.num_qubits
+    weights = 1 << np.arange(n, dtype=np.int64)
+    masks = hamiltonian.paulis.z.astype(np.int64) @ weights
+
+    diagonal = np.zeros(2 ** n)
+    np.add.at(diagonal, masks, np.real(hamiltonian.coeffs))
+
+    # In-place Walsh-Hadamard transform, one qubit at a time
+    for qubit in range(n):
+        view = diagonal.reshape(2 ** (n - 1 - qubit), 2, 2 ** qubit)
+        tmp = view[:, 0].copy()
+        view[:, 0] += view[:, 1]
+        view[:, 1] = tmp - view[:, 1]
+
+    return diagonal
+
+
+def _gate_matrices(kind, data, param_matrix):
+    """
+    Batch of 2x2 matrices for one single-qubit gate.
+
+    Args:
+        kind: Gate name, or 'unitary' for a fixed matrix
+        data: Parameter index, (index, phi) for the r gate, or the fixed matrix
+        param_matrix: Array of shape (batch, num_parameters)
+
+    Returns:
+        Array of shape (batch, 2, 2)
+    """
+    batch = len(param_matrix)
+    if kind == "unitary":
+        return np.broadcast_to(data, (batch, 2, 2))
+
+    theta = param_matrix[:, data[0] if kind == "r" else data]
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    if kind == "ry":
+        return np.stack([np.stack([c, -s], -1), np.stack([s, c], -1)], -2)
+    if kind == "rx":
+        return np.stack([np.stack([c, -1j * s], -1), np.stack([-1j * s, c], -1)], -2)
+    if kind == "r":
+        phase = np.exp(1j * data[1])
+        return np.stack([np.stack([c, -1j * s / phase], -1),
+                         np.stack([-1j * s * phase, c], -1)], -2)
+
+    matrices = np.zeros((batch, 2, 2), dtype=complex)
+    if kind == "rz":
+        matrices[:, 0, 0] = np.exp(-0.5j * theta)
+        matrices[:, 1, 1] = np.exp(0.5j * theta)
+    else:
+        matrices[:, 0, 0] = 1.0
+        matrices[:, 1, 1] = np.exp(1j * theta)
+    return matrices
+
+
+def _batch_kron(left, right):
+    """Kronecker product of two batches of square matrices."""
+    batch, dl, dr = len(left), left.shape[-1], right.shape[-1]
+    product = left[:, :, None, :, None] * right[:, None, :, None, :]
+    return product.reshape(batch, dl * dr, dl * dr)
+
+
+class DiagonalStatevectorEngine:
+    """
+    NumPy state-vector simulator for VQE on diagonal (QUBO/Ising) Hamiltonians.
+
+    The ansatz is compiled once: runs of single-qubit gates are fused into
+    layers applied as small dense blocks, and cx/cz/swap gates become amplitude
+    swaps and sign flips on a batch of state vectors. The energy of each state
+    is the dot product of its probabilities with the precomputed energy diagonal.
+    """
+
+    def __init__(self, ansatz, hamiltonian, block_size=5, max_batch_bytes=2 ** 30):
+        """
+        Initialize the engine.
+
+        Args:
+            ansatz: Decomposed parameterized QuantumCircuit
+            hamiltonian: SparsePauliOp containing only I and Z terms
+            block_size: Number of qubits per fused single-qubit block
+            max_batch_bytes: Memory budget for the batch of state vectors
+        """
+        if ansatz.num_qubits != hamiltonian.num_qubits:
+            raise ValueError("Ansatz and Hamiltonian must act on the same number of qubits")
+
+        self._num_qubits = ansatz.num_qubits
+        self._num_parameters = ansatz.num_parameters
+        self._block_size = block_size
+        self._max_batch_bytes = max_batch_bytes
+        self._diagonal = diagonal_energies(hamiltonian)
+        self._operations, self._is_complex = self._compile(ansatz)
+
+    @property
+    def num_qubits(self):
+        return self._num_qubits
+
+    @property
+    def diagonal(self):
+        return self._diagonal
+
+    def _compile(self, ansatz):
+        """
+        Translate the circuit into fused single-qubit layers and two-qubit gates.
+
+        Returns:
+            Tuple of (operations, is_complex), where each operation is either
+            ('layer', {qubit: [(kind, data), ...]}) or (gate name, qubits)
+        """
+        parameter_index = {parameter: i for i, parameter in enumerate(ansatz.parameters)}
+        operations = []
+        layer = {}
+        is_complex = False
+
+        for instruction in ansatz.data:
+            gate = instruction.operation
+            qubits = [ansatz.find_bit(qubit).index for qubit in instruction.qubits]
+
+            if gate.name in IGNORED_GATES:
+                continue
+            if gate.name in TWO_QUBIT_GATES:
+                # Single-qubit gates commute across qubits, so a layer only
+                # has to be flushed at the next entangling gate
+                if layer:
+                    operations.append(("layer", layer))
+                    layer = {}
+                operations.append((gate.name, qubits))
+                continue
+
+            if gate.name in PARAMETRIC_GATES and isinstance(gate.params[0], ParameterExpression):
+                if (not isinstance(gate.params[0], Parameter)
+                        or any(isinstance(value, ParameterExpression) for value in gate.params[1:])):
+                    raise ValueError(f"Gate {gate.name} must depend on a single parameter")
+                # The r gate also carries its fixed rotation axis phi
+                data = parameter_index[gate.params[0]]
+                if gate.name == "r":
+                    data = (data, float(gate.params[1]))
+                kind = gate.name
+                is_complex = is_complex or gate.name != "ry"
+            elif gate.num_qubits == 1 and not gate.is_parameterized():
+                data = np.asarray(gate.to_matrix())
+                if np.allclose(data.imag, 0):
+                    data = data.real
+                else:
+                    is_complex = True
+                kind = "unitary"
+            else:
+                raise ValueError(f"Unsupported gate for the NumPy engine: {gate.name}")
+
+            layer.setdefault(qubits[0], []).append((kind, data))
+
+        if layer:
+            operations.append(("layer", layer))
+        return operations, is_complex
+
+    def statevectors(self, param_matrix):
+        """
+        Simulate the ansatz for a batch of parameter sets.
+
+        Args:
+            param_matrix: Array of shape (batch, num_parameters)
+
+        Returns:
+            Array of shape (batch, 2^n) with the final state vectors
+        """
+        param_matrix = np.atleast_2d(np.asarray(param_matrix, dtype=float))
+        if param_matrix.shape[1] != self._num_parameters:
+            raise ValueError(f"Each parameter set must have {self._num_parameters} parameters")
+
+        batch = len(param_matrix)
+        dtype = np.complex128 if self._is_complex else np.float64
+        state = np.zeros((batch, 2 ** self._num_qubits), dtype=dtype)
+        state[:, 0] = 1.0
+
+        for operation in self._operations:
+            if operation[0] == "layer":
+                state = self._apply_layer(state, operation[1], param_matrix)
+            else:
+                self._apply_two_qubit(state, *operation)
+
+        return state
+
+    def _apply_layer(self, state, layer, param_matrix):
+        """
+        Apply a layer of single-qubit gates.
+
+        The gates of each block of `block_size` consecutive qubits are combined
+        into one dense (2^k x 2^k) matrix per parameter set and applied with a
+        single batched matrix product.
+        """
+        n = self._num_qubits
+        batch = len(param_matrix)
+        identity = np.broadcast_to(np.eye(2), (batch, 2, 2))
+
+        # Combined 2x2 matrix of every gate run, applied in circuit order
+        qubit_matrices = {}
+        for qubit, gates in layer.items():
+            combined = identity
+            for kind, data in gates:
+                combined = _gate_matrices(kind, data, param_matrix) @ combined
+            qubit_matrices[qubit] = combined.astype(state.dtype, copy=False)
+
+        for low in range(0, n, self._block_size):
+            high = min(low + self._block_size, n)
+            if not any(low <= qubit < high for qubit in qubit_matrices):
+                continue
+
+            # Most significant qubit first, matching the flat index ordering
+            block = qubit_matrices.get(high - 1, identity)
+            for qubit in range(high - 2, low - 1, -1):
+                block = _batch_kron(block, qubit_matrices.get(qubit, identity))
+            dim = block.shape[-1]
+
+            if low == 0:
+                # Amplitudes of the block are contiguous: one GEMM per parameter set
+                view = state.reshape(batch, -1, dim)
+                state = np.matmul(view, np.swapaxes(block, -1, -2)).reshape(batch, -1)
+            else:
+                view = state.reshape(batch, -1, dim, 2 ** low)
+                state = np.matmul(block[:, None], view).reshape(batch, -1)
+
+        return state
+
+    def _apply_two_qubit(self, state, kind, qubits):
+        """Apply a cx, cz or swap gate in place."""
+        n = self._num_qubits
+        high, low = max(qubits), min(qubits)
+        view = state.reshape(len(state), 2 ** (n - 1 - high), 2,
+                             2 ** (high - low - 1), 2, 2 ** low)
+        axis = {qubit: (2 if qubit == high else 4) for qubit in qubits}
+
+        def select(values):
+            index = [slice(None)] * 6
+            for qubit, value in zip(qubits, values):
+                index[axis[qubit]] = value
+            return tuple(index)
+
+        if kind == "cz":
+            view[select((1, 1))] *= -1
+            return
+        if kind == "cx":
+            # Swap target amplitudes in the control = 1 subspace
+            first, second = select((1, 0)), select((1, 1))
+        else:
+            first, second = select((0, 1)), select((1, 0))
+
+        tmp = view[first].copy()
+        view[first] = view[second]
+        view[second] = tmp
+
+    def probabilities(self, param_matrix):
+        """
+        Basis-state probabilities for a batch of parameter sets.
+
+        Args:
+            param_matrix: Array of shape (batch, num_parameters)
+
+        Returns:
+            Array of shape (batch, 2^n)
+        """
+        states = self.statevectors(param_matrix)
+        return np.real(states * np.conj(states))
+
+    def energies(self, param_matrix):
+        """
+        Expectation values of the Hamiltonian for a batch of parameter sets.
+
+        The batch is split into chunks so that the state vectors stay within
+        the memory budget.
+
+        Args:
+            param_matrix: Array of shape (batch, num_parameters)
+
+        Returns:
+            numpy array with one energy per parameter set
+        """
+        param_matrix = np.atleast_2d(np.asarray(param_matrix, dtype=float))
+        itemsize = 16 if self._is_complex else 8
+        chunk = max(1, self._max_batch_bytes // (itemsize * 2 ** self._num_qubits))
+
+        energies = [self.probabilities(param_matrix[start:start + chunk]) @ self._diagonal
+                    for start in range(0, len(param_matrix), chunk)]
+        return np.concatenate(energies)
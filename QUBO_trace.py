@@ -0,0 +1,224 @@
+import io
+import csv
+import json
+import time
+import pstats
+import cProfile
+
+import numpy as np
+
+
+def circuit_metrics(circuit):
+    """
+    Depth and two-qubit gate count of a circuit.
+
+    Args:
+        circuit: QuantumCircuit
+
+    Returns:
+        Tuple of (depth, two_qubit_gates)
+    """
+    two_qubit_gates = sum(1 for instruction in circuit.data
+                          if instruction.operation.num_qubits == 2
+                          and instruction.operation.name != "barrier")
+    return circuit.depth(), two_qubit_gates
+
+
+class PerformanceTrace:
+    """
+    Structured performance trace of VQESolver runs.
+
+    Every cost evaluation is recorded with its wall time (since the previous
+    evaluation, so it includes optimizer overhead), the estimator latency, the
+    executed circuit's depth and two-qubit gate count, the parameter norm and
+    the cost. Transpilation and sampling are recorded as events, and each
+    solve gets a summary with totals. Records export to JSON lines or CSV.
+    """
+
+    def __init__(self, profile=False):
+        """
+        Initialize the trace.
+
+        Args:
+            profile: Run cProfile during each solve
+        """
+        self._profile = profile
+        self._profiler = None
+        self._records = []
+        self._solves = []
+        self._current_solve = None
+        self._last_time = None
+        self._metrics = {}
+
+    @property
+    def records(self):
+        return self._records
+
+    @property
+    def solves(self):
+        return self._solves
+
+    def _metrics_for(self, circuit):
+        # Circuits are immutable while a solve runs, so cache metrics by identity
+        key = id(circuit)
+        if key not in self._metrics:
+            self._metrics[key] = (circuit, circuit_metrics(circuit))
+        return self._metrics[key][1]
+
+    def start_solve(self, **info):
+        """
+        Start a new solve.
+
+        Args:
+            **info: Descriptive fields stored with the solve summary (optimizer, ...)
+        """
+        self._current_solve = {
+            "solve": len(self._solves),
+            **info,
+            "start": time.time(),
+            "evaluations": 0,
+            "estimator_time": 0.0,
+            "transpile_time": 0.0,
+            "sampler_time": 0.0,
+        }
+        self._last_time = time.perf_counter()
+        self._solve_start = self._last_time
+        if self._profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def end_solve(self, **info):
+        """
+        Finish the current solve and compute its totals.
+
+        Args:
+            **info: Extra fields for the solve summary (final cost, ...)
+
+        Returns:
+            dict with the solve summary
+        """
+        if self._current_solve is None:
+            return None
+        if self._profiler is not None:
+            self._profiler.disable()
+
+        summary = self._current_solve
+        summary.update(info)
+        summary["wall_time"] = time.perf_counter() - self._solve_start
+        # Time outside the estimator; concurrent jobs (AsyncVQEDriver) overlap,
+        # so their summed latency can exceed the wall time
+        summary["optimizer_time"] = max(summary["wall_time"] - summary["estimator_time"]
+                                        - summary["transpile_time"] - summary["sampler_time"], 0.0)
+        self._solves.append(summary)
+        self._current_solve = None
+        return summary
+
+    def record_evaluation(self, costs, param_matrix, latency, circuit=None):
+        """
+        Record a (possibly batched) cost evaluation.
+
+        Args:
+            costs: Evaluated costs, one per parameter set
+            param_matrix: Array of shape (batch, num_parameters)
+            latency: Seconds spent in the estimator (or engine) call
+            circuit: Executed circuit, for depth and two-qubit gate count
+        """
+        now = time.perf_counter()
+        wall_time = now - self._last_time if self._last_time is not None else latency
+        self._last_time = now
+
+        depth, two_qubit_gates = (None, None) if circuit is None else self._metrics_for(circuit)
+        batch = len(costs)
+        for index, (cost, params) in enumerate(zip(costs, param_matrix)):
+            self._records.append({
+                "type": "evaluation",
+                "solve": None if self._current_solve is None else self._current_solve["solve"],
+                "timestamp": time.time(),
+                "batch_size": batch,
+                "batch_index": index,
+                # Batch timings are split evenly between its parameter sets
+                "wall_time": wall_time / batch,
+                "estimator_latency": latency / batch,
+                "depth": depth,
+                "two_qubit_gates": two_qubit_gates,
+                "param_norm": float(np.linalg.norm(params)),
+                "cost": float(cost),
+            })
+
+        if self._current_solve is not None:
+            self._current_solve["evaluations"] += batch
+            self._current_solve["estimator_time"] += latency
+
+    def record_event(self, kind, duration, **fields):
+        """
+        Record a non-evaluation event such as 'transpile' or 'sample'.
+
+        Args:
+            kind: Event type
+            duration: Seconds spent
+            **fields: Extra fields stored with the event
+        """
+        self._records.append({
+            "type": kind,
+            "solve": None if self._current_solve is None else self._current_solve["solve"],
+            "timestamp": time.time(),
+            "duration": duration,
+            **fields,
+        })
+        if self._current_solve is not None:
+            if kind == "transpile":
+                self._current_solve["transpile_time"] += duration
+            elif kind == "sample":
+                self._current_solve["sampler_time"] += duration
+
+    def to_jsonl(self, path, include_solves=True):
+        """Write records (and solve summaries) as JSON lines."""
+        with open(path, "w") as f:
+            for record in self._records:
+                f.write(json.dumps(record) + "\n")
+            if include_solves:
+                for summary in self._solves:
+                    f.write(json.dumps({"type": "solve", **summary}) + "\n")
+
+    def to_csv(self, path, record_type="evaluation"):
+        """
+        Write records of one type as CSV.
+
+        Args:
+            path: Output file
+            record_type: 'evaluation', 'transpile', 'sample' or 'solve'
+        """
+        rows = self._solves if record_type == "solve" else [
+            record for record in self._records if record["type"] == record_type
+        ]
+        fields = []
+        for row in rows:
+            fields.extend(key for key in row if key not in fields)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def profile_stats(self, sort="cumulative", limit=20):
+        """
+        Text report of the cProfile data of the last solve (profile=True only).
+
+        Returns:
+            str with the pstats report, or None if profiling is disabled
+        """
+        if self._profiler is None:
+            return None
+        stream = io.StringIO()
+        pstats.Stats(self._profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump_profile(self, path):
+        """Save the cProfile data of the last solve for snakeviz/pstats."""
+        if self._profiler is not None:
+            self._profiler.dump_stats(path)
+
+    def clear(self):
+        """Remove all records and solve summaries."""
+        self._records = []
+        self._solves = []
+        self._metrics = {}
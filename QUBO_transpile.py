@@ -0,0 +1,170 @@
+import os
+import hashlib
+from collections import OrderedDict
+
+from qiskit import qpy
+from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
+
+
+def circuit_fingerprint(circuit):
+    """
+    Content hash of a circuit's structure.
+
+    Parameters are identified by name, so two ansatzes built independently
+    with the same gates, qubits and parameter names share a fingerprint.
+
+    Args:
+        circuit: QuantumCircuit
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{circuit.num_qubits}|{circuit.num_clbits}".encode())
+    for instruction in circuit.data:
+        qubits = tuple(circuit.find_bit(qubit).index for qubit in instruction.qubits)
+        clbits = tuple(circuit.find_bit(clbit).index for clbit in instruction.clbits)
+        params = tuple(str(param) for param in instruction.operation.params)
+        digest.update(repr((instruction.operation.name, qubits, clbits, params)).encode())
+    return digest.hexdigest()
+
+
+def target_fingerprint(backend):
+    """
+    Hash of the parts of a backend target that determine transpilation.
+
+    Args:
+        backend: Backend with a `target`
+
+    Returns:
+        Hex digest string
+    """
+    target = backend.target
+    coupling_map = target.build_coupling_map()
+    edges = sorted(coupling_map.get_edges()) if coupling_map is not None else []
+    description = (backend.name, target.num_qubits, sorted(target.operation_names), edges)
+    return hashlib.sha256(repr(description).encode()).hexdigest()
+
+
+class TranspileCache:
+    """
+    Content-addressed cache of transpiled (ISA) circuits and their layouts.
+
+    Entries are keyed by circuit structure, backend target and optimization
+    level. They are kept in an in-memory LRU and, when a directory is given,
+    persisted as QPY files so they survive across processes.
+    """
+
+    def __init__(self, cache_dir=None, max_entries=128):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for the on-disk store (memory only if None)
+            max_entries: Maximum number of circuits kept in memory
+        """
+        self._cache_dir = cache_dir
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    @property
+    def stats(self):
+        return dict(self._stats)
+
+    def key(self, circuit, backend, optimization_level=3, seed_transpiler=None):
+        """Cache key for a circuit transpiled against a backend."""
+        description = (circuit_fingerprint(circuit), target_fingerprint(backend),
+                       optimization_level, seed_transpiler)
+        return hashlib.sha256(repr(description).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self._cache_dir, f"{key}.qpy")
+
+    def _store(self, key, circuit):
+        self._entries[key] = circuit
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        """
+        Look up a transpiled circuit.
+
+        Returns:
+            QuantumCircuit, or None if the key is not cached
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return self._entries[key]
+
+        if self._cache_dir is not None and os.path.exists(self._path(key)):
+            with open(self._path(key), "rb") as f:
+                circuit = qpy.load(f)[0]
+            self._store(key, circuit)
+            self._stats["disk_hits"] += 1
+            return circuit
+
+        return None
+
+    def put(self, key, circuit):
+        """Add a transpiled circuit to the cache (and to disk if enabled)."""
+        self._store(key, circuit)
+        if self._cache_dir is not None:
+            # Write then rename so concurrent readers never see partial files
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                qpy.dump(circuit, f)
+            os.replace(tmp_path, self._path(key))
+
+    def transpile(self, circuit, backend, optimization_level=3, seed_transpiler=None):
+        """
+        Return the ISA circuit for `circuit`, transpiling only on a cache miss.
+
+        Args:
+            circuit: QuantumCircuit to transpile
+            backend: Target backend
+            optimization_level: Preset pass manager optimization level
+            seed_transpiler: Seed for the stochastic transpiler passes
+
+        Returns:
+            Transpiled QuantumCircuit (with its layout)
+        """
+        key = self.key(circuit, backend, optimization_level, seed_transpiler)
+        isa_circuit = self.get(key)
+        if isa_circuit is None:
+            self._stats["misses"] += 1
+            pm = generate_preset_pass_manager(
+                backend=backend,
+                target=backend.target,
+                optimization_level=optimization_level,
+                seed_transpiler=seed_transpiler
+            )
+            isa_circuit = pm.run(circuit)
+            self.put(key, isa_circuit)
+        return isa_circuit
+
+    def clear(self, disk=False):
+        """
+        Empty the in-memory cache.
+
+        Args:
+            disk: Also delete the QPY files of the on-disk store
+        """
+        self._entries.clear()
+        if disk and self._cache_dir is not None:
+            for name in os.listdir(self._cache_dir):
+                if name.endswith(".qpy"):
+                    os.remove(os.path.join(self._cache_dir, name))
+
+
+# Shared by every VQESolver unless a dedicated cache is set
+default_transpile_cache = TranspileCache()
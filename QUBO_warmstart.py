@@ -0,0 +1,139 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from QUBO_transpile import circuit_fingerprint
+
+
+def hamiltonian_terms(hamiltonian):
+    """
+    Pauli label -> real coefficient mapping of a Hamiltonian.
+
+    Args:
+        hamiltonian: SparsePauliOp
+
+    Returns:
+        dict mapping Pauli labels to coefficients
+    """
+    return {label: float(np.real(coeff)) for label, coeff in hamiltonian.simplify().to_list()}
+
+
+def structure_fingerprint(terms):
+    """Hash of the set of Pauli labels (the Hamiltonian's sparsity pattern)."""
+    return hashlib.sha256("|".join(sorted(terms)).encode()).hexdigest()
+
+
+def terms_distance(terms_a, terms_b):
+    """
+    Relative L2 distance between two Hamiltonians' coefficient vectors.
+
+    Returns:
+        ||a - b|| / ||a||, with missing labels treated as zero coefficients
+    """
+    labels = set(terms_a) | set(terms_b)
+    diff = np.array([terms_a.get(label, 0.0) - terms_b.get(label, 0.0) for label in labels])
+    norm = np.linalg.norm(list(terms_a.values()))
+    return float(np.linalg.norm(diff) / norm) if norm > 0 else float(np.linalg.norm(diff))
+
+
+class WarmStartStore:
+    """
+    Store of optimized VQE parameters for warm-starting related problems.
+
+    Each entry records the optimized parameters with the Hamiltonian terms,
+    a fingerprint of its structure and the ansatz it was solved with. For a new
+    Hamiltonian, the nearest compatible entry (same number of qubits and same
+    ansatz) is used as the initial point, preferring the same structure only
+    between equally distant entries.
+    """
+
+    def __init__(self, path=None, max_entries=256):
+        """
+        Initialize the store.
+
+        Args:
+            path: JSON file to persist entries to (memory only if None)
+            max_entries: Maximum number of entries kept (oldest dropped first)
+        """
+        self._path = path
+        self._max_entries = max_entries
+        self._entries = []
+
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    @property
+    def entries(self):
+        return self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _shape_key(self, hamiltonian, ansatz):
+        return f"{hamiltonian.num_qubits}:{ansatz.num_parameters}:{circuit_fingerprint(ansatz)}"
+
+    def record(self, hamiltonian, ansatz, parameters, energy=None):
+        """
+        Add an optimized solution to the store.
+
+        Args:
+            hamiltonian: SparsePauliOp that was solved
+            ansatz: Ansatz circuit used for the solve
+            parameters: Optimized parameters
+            energy: Final energy (optional)
+        """
+        terms = hamiltonian_terms(hamiltonian)
+        self._entries.append({
+            "shape": self._shape_key(hamiltonian, ansatz),
+            "structure": structure_fingerprint(terms),
+            "terms": terms,
+            "parameters": [float(value) for value in parameters],
+            "energy": None if energy is None else float(energy),
+        })
+        del self._entries[:-self._max_entries]
+
+        if self._path is not None:
+            tmp_path = f"{self._path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self._path)
+
+    def nearest(self, hamiltonian, ansatz, max_distance=None):
+        """
+        Find the stored solution closest to a Hamiltonian.
+
+        Every entry with a compatible shape is considered. The relative
+        coefficient distance decides; the structure fingerprint only breaks
+        ties, so a closer entry with a different sparsity pattern wins over a
+        distant one with the same pattern.
+
+        Args:
+            hamiltonian: SparsePauliOp to solve
+            ansatz: Ansatz circuit that will be used
+            max_distance: Maximum relative coefficient distance accepted
+
+        Returns:
+            Tuple of (parameters, distance), or None if no entry is compatible
+        """
+        shape = self._shape_key(hamiltonian, ansatz)
+        candidates = [entry for entry in self._entries if entry["shape"] == shape]
+        if not candidates:
+            return None
+
+        terms = hamiltonian_terms(hamiltonian)
+        structure = structure_fingerprint(terms)
+        distances = [terms_distance(terms, entry["terms"]) for entry in candidates]
+        best = min(range(len(candidates)),
+                   key=lambda i: (distances[i], candidates[i]["structure"] != structure))
+        if max_distance is not None and distances[best] > max_distance:
+            return None
+        return np.array(candidates[best]["parameters"]), distances[best]
+
+    def clear(self):
+        """Remove all entries (and the persisted file)."""
+        self._entries = []
+        if self._path is not None and os.path.exists(self._path):
+            os.remove(self._path)
@@ -1,7 +1,50 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import rasterio
-from rasterio.transform import xy
 import numpy as np
 
+COLUMNS = ["lon", "lat", "row", "col", "value"]
+
+
+def pixel_to_coords(transform, rows, cols):
+    """
+    Georeference pixel centers with one affine operation on whole arrays.
+
+    Equivalent to calling rasterio.transform.xy(transform, r, c) for every
+    pixel, without the per-pixel Python overhead.
+
+    Parameters
+    ----------
+    transform : affine.Affine
+        Dataset transform (src.transform).
+    rows, cols : numpy.ndarray
+        Pixel row and column indices.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        (x, y) coordinates of the pixel centers in the dataset CRS
+        (longitude and latitude for geographic rasters).
+    """
+    rows = np.asarray(rows, dtype=np.float64) + 0.5
+    cols = np.asarray(cols, dtype=np.float64) + 0.5
+    x = transform.a * cols + transform.b * rows + transform.c
+    y = transform.d * cols + transform.e * rows + transform.f
+    return x, y
+
+
+def _detections(transform, band, row_offset=0, col_offset=0):
+    """Columnar detections of the non-zero pixels of a band (or band window)."""
+    rows, cols = np.nonzero(band > 0)
+    values = band[rows, cols]
+    rows = rows + row_offset
+    cols = cols + col_offset
+    lon, lat = pixel_to_coords(transform, rows, cols)
+    return {"lon": lon, "lat": lat, "row": rows, "col": cols, "value": values}
+
+
 def extract_fire_coords(tiff_path, band_index=23):
     """
     Extract geocoordinates of active fire pixels from a specific band in a GeoTIFF.
@@ -15,41 +58,166 @@ def extract_fire_coords(tiff_path, band_index=23):
 
     Returns
     -------
-    list of tuple
-        List of (longitude, latitude) coordinates where fire is detected.
+    dict of numpy.ndarray
+        Columns 'lon', 'lat' (pixel centers in the raster CRS), 'row', 'col'
+        and 'value' (band value), one entry per fire pixel.
+    """
+    with rasterio.open(tiff_path) as src:
+        return _detections(src.transform, src.read(band_index))
+
+
+def _band_has_no_fire(src, band_index):
+    """
+    True when the band's cached exact statistics show no positive pixel.
+
+    Approximate statistics (STATISTICS_APPROXIMATE=YES) are computed from
+    overviews and can miss isolated detections, so they are not trusted.
+    """
+    tags = src.tags(band_index)
+    maximum = tags.get("STATISTICS_MAXIMUM")
+    if maximum is None or tags.get("STATISTICS_APPROXIMATE", "NO").upper() == "YES":
+        return False
+    return float(maximum) <= 0
+
+
+def _overview_fire_mask(tiff_path, src, band_index):
+    """Fire mask of the coarsest overview of the band, or None without overviews."""
+    factors = src.overviews(band_index)
+    if not factors:
+        return None
+    with rasterio.open(tiff_path, overview_level=len(factors) - 1) as overview:
+        return overview.read(band_index) > 0
+
+
+def scan_fire_blocks(tiff_path, band_index=23, use_overview=False, use_statistics=True):
+    """
+    Stream fire pixels of a large GeoTIFF one internal block at a time.
+
+    Only one block of the fire band is in memory at a time. The whole band
+    is skipped when its exact statistics (STATISTICS_MAXIMUM tag, unless
+    STATISTICS_APPROXIMATE=YES) show no fire at all. Otherwise every block is
+    read, except that with use_overview blocks whose area of the coarsest
+    overview has no fire are skipped.
+
+    Parameters
+    ----------
+    tiff_path : str
+        Path to the GeoTIFF file.
+    band_index : int
+        Band number to extract (default = 23 for active fire).
+    use_overview : bool
+        Skip blocks using the coarsest overview. The overviews must keep any
+        fire pixel visible, e.g. average resampling of a float band with
+        non-negative values; nearest or mode overviews, or averages rounded
+        to an integer dtype, can hide isolated detections.
+    use_statistics : bool
+        Skip the whole band when its cached exact statistics show no fire.
+
+    Yields
+    ------
+    dict of numpy.ndarray
+        Columnar detections ('lon', 'lat', 'row', 'col', 'value') of each
+        block containing fire, with rows and columns in full-raster pixels.
     """
     with rasterio.open(tiff_path) as src:
-        # Read the fire band
-        fire_band = src.read(band_index)
+        if use_statistics and _band_has_no_fire(src, band_index):
+            return
+        overview = _overview_fire_mask(tiff_path, src, band_index) if use_overview else None
 
-        # Find all non-zero pixels (fire detections)
-        rows, cols = np.where(fire_band > 0)
+        for _, window in src.block_windows(band_index):
+            if overview is not None:
+                # Overview pixels covering the block
+                scale_rows = overview.shape[0] / src.height
+                scale_cols = overview.shape[1] / src.width
+                row_start = int(np.floor(window.row_off * scale_rows))
+                row_stop = int(np.ceil((window.row_off + window.height) * scale_rows))
+                col_start = int(np.floor(window.col_off * scale_cols))
+                col_stop = int(np.ceil((window.col_off + window.width) * scale_cols))
+                if not overview[row_start:row_stop, col_start:col_stop].any():
+                    continue
 
-        # Convert pixel positions to geographic coordinates
-        coords = [xy(src.transform, r, c) for r, c in zip(rows, cols)]
+            band = src.read(band_index, window=window)
+            if not (band > 0).any():
+                continue
+            yield _detections(src.transform, band, window.row_off, window.col_off)
 
-    return coords
 
+def concat_detections(chunks, value_dtype=np.float64):
+    """
+    Concatenate columnar detection chunks (e.g. from scan_fire_blocks).
+
+    Parameters
+    ----------
+    chunks : iterable of dict
+        Columnar detections as yielded by scan_fire_blocks.
+    value_dtype : numpy dtype
+        Dtype of the 'value' column when there are no chunks (pass the fire
+        band's dtype, src.dtypes[band_index - 1], to match extract_fire_coords).
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        Columns 'lon', 'lat' (float64), 'row', 'col' (int64) and 'value'.
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return {"lon": np.empty(0), "lat": np.empty(0),
+                "row": np.empty(0, dtype=np.int64), "col": np.empty(0, dtype=np.int64),
+                "value": np.empty(0, dtype=value_dtype)}
+    return {column: np.concatenate([chunk[column] for chunk in chunks]) for column in COLUMNS}
+
+
+def extract_fire_coords_batch(tiff_files, band_index=23, workers=None, pattern="*.tif"):
+    """
+    Extract fire pixels from many daily rasters in parallel worker processes.
+
+    Parameters
+    ----------
+    tiff_files : str or list of str
+        Directory of GeoTIFFs (matched with `pattern`) or list of paths.
+    band_index : int
+        Band number to extract (default = 23 for active fire).
+    workers : int or None
+        Number of worker processes (os.cpu_count() if None, 1 = no pool).
+    pattern : str
+        Glob pattern used when `tiff_files` is a directory.
+
+    Returns
+    -------
+    dict
+        Path -> columnar detections as returned by extract_fire_coords, in
+        the order of `tiff_files` (sorted paths when it is a directory).
+    """
+    if isinstance(tiff_files, str):
+        tiff_files = sorted(glob.glob(os.path.join(tiff_files, pattern)))
+    workers = os.cpu_count() if workers is None else workers
+
+    if workers == 1 or len(tiff_files) <= 1:
+        results = [extract_fire_coords(f, band_index) for f in tiff_files]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tiff_files))) as pool:
+            results = list(pool.map(extract_fire_coords, tiff_files,
+                                    [band_index] * len(tiff_files)))
+    return dict(zip(tiff_files, results))
 
-# Example usage with one file
-coords = extract_fire_coords("./2021-09-04.tif")
-print(f"Extracted {len(coords)} fire pixels")
-print("First 10 coordinates:", coords[:10])
 
-# If you want to process all your uploaded files:
-tiff_files = [
-    "./2021-09-04.tif",
-    "./2021-09-05.tif",
-    "./2021-09-06.tif",
-    "./2021-09-07.tif",
-    "./2021-09-08.tif",
-]
+if __name__ == "__main__":
+    # Example usage with one file
+    coords = extract_fire_coords("./2021-09-04.tif")
+    print(f"Extracted {len(coords['lon'])} fire pixels")
+    print("First 10 coordinates:", list(zip(coords["lon"][:10], coords["lat"][:10])))
 
-all_fire_coords = {}
-for f in tiff_files:
-    all_fire_coords[f] = extract_fire_coords(f)
+    # If you want to process all your uploaded files:
+    tiff_files = [
+        "./2021-09-04.tif",
+        "./2021-09-05.tif",
+        "./2021-09-06.tif",
+        "./2021-09-07.tif",
+        "./2021-09-08.tif",
+    ]
 
-# Example: number of detections per file
-for f, coords in all_fire_coords.items():
-    print(f"{f}: {len(coords)} fire detections")
+    all_fire_coords = extract_fire_coords_batch(tiff_files)
 
+    # Example: number of detections per file
+    for f, coords in all_fire_coords.items():
+        print(f"{f}: {len(coords['lon'])} fire detections")
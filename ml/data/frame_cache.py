@@ -0,0 +1,168 @@
+import os
+import time
+import hashlib
+import tempfile
+import numpy as np
+
+# Temporary files older than this were left by a crashed writer
+STALE_TMP_SECONDS = 600
+
+
+def _default_cache_dir():
+    # /dev/shm keeps the store in shared memory on Linux
+    root = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(root, "firespread_frames")
+
+
+class FrameCache:
+    """
+    Decoded-frame cache shared by all DataLoader workers.
+
+    Frames are stored as .npy files in a shared directory (shared memory under
+    /dev/shm by default) and read back memory-mapped, so every worker process
+    sees the frames decoded by the others. Writes go to a temporary file that
+    is atomically renamed, and a frame removed by another process while being
+    read is simply treated as a miss, so no locking is needed. A frame that
+    cannot be stored (e.g. /dev/shm is full) is returned uncached.
+
+    The total size is kept under max_bytes by evicting the least recently used
+    frames (a hit refreshes the file's modification time). To avoid listing
+    the directory on every miss, each process adds its own writes to the size
+    found by the last scan and only scans and evicts, down to 90% of
+    max_bytes, when that estimate exceeds max_bytes; with several processes
+    the store can briefly exceed max_bytes by what the others wrote since.
+    Temporary files left by crashed writers count towards the size and are
+    removed by the scans.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=2 * 1024 ** 3):
+        """
+        cache_dir: directory of the store (shared by every process using it)
+        max_bytes: maximum total size of the cached frames
+        """
+        self.cache_dir = _default_cache_dir() if cache_dir is None else cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._evict()
+
+    def key(self, path, **settings):
+        """
+        Cache key of a frame: the source file (path, size and modification
+        time, so edited files are decoded again) and the decoding settings
+        (channels, resize_to, normalization, ...).
+        """
+        stat = os.stat(path)
+        description = repr((os.path.abspath(path), stat.st_size, stat.st_mtime_ns,
+                            sorted(settings.items())))
+        return hashlib.sha1(description.encode()).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.cache_dir, key + ".npy")
+
+    def get(self, key):
+        """Cached frame as a read-only memory-mapped array, or None."""
+        file = self._file(key)
+        try:
+            frame = np.load(file, mmap_mode="r")
+            os.utime(file)
+        except (FileNotFoundError, ValueError):
+            # Missing, evicted meanwhile, or still incomplete
+            return None
+        return frame
+
+    def put(self, key, frame):
+        """
+        Store a frame and evict the least recently used ones if needed.
+
+        Returns:
+            True if the frame was stored, False if writing it failed
+        """
+        file = self._file(key)
+        tmp = f"{file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(frame))
+                size = f.tell()
+            os.replace(tmp, file)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        self._size += size
+        if self._size > self.max_bytes:
+            self._evict()
+        return True
+
+    def get_or_load(self, path, loader, **settings):
+        """
+        Cached frame of `path` for the given settings, calling loader(path)
+        and caching its result on a miss.
+        """
+        key = self.key(path, **settings)
+        frame = self.get(key)
+        if frame is not None:
+            self.hits += 1
+            return frame
+        self.misses += 1
+        frame = loader(path)
+        self.put(key, frame)
+        return frame
+
+    def _scan(self):
+        """
+        Cached frames as (mtime_ns, size, path) and the total size of the
+        temporary files being written, removing stale temporary files.
+        """
+        entries, pending = [], 0
+        stale = time.time_ns() - STALE_TMP_SECONDS * 10 ** 9
+        for entry in os.scandir(self.cache_dir):
+            is_tmp = entry.name.endswith(".tmp")
+            if not (is_tmp or entry.name.endswith(".npy")):
+                continue
+            try:
+                stat = entry.stat()
+                if is_tmp and stat.st_mtime_ns < stale:
+                    os.remove(entry.path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if is_tmp:
+                pending += stat.st_size
+            else:
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries, pending
+
+    def size(self):
+        """Total size in bytes of the cached frames and pending writes."""
+        entries, pending = self._scan()
+        return sum(size for _, size, _ in entries) + pending
+
+    def _evict(self):
+        entries, pending = self._scan()
+        total = sum(size for _, size, _ in entries) + pending
+        if total > self.max_bytes:
+            target = 0.9 * self.max_bytes
+            for _, size, file in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(file)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        self._size = total
+
+    def clear(self):
+        """Remove every cached frame."""
+        entries, _ = self._scan()
+        for _, _, file in entries:
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+        self._size = 0
@@ -0,0 +1,231 @@
+import os
+import json
+import math
+import hashlib
+import datetime
+import torch
+import numpy as np
+from torch.utils.data import Sampler
+
+from ml.data.split_data import FireSpreadDataset
+
+INDEX_VERSION = 2
+
+
+def _parse_date(name):
+    try:
+        return datetime.date.fromisoformat(name[:-len('.tif')])
+    except ValueError:
+        return None
+
+
+def _user_index_path(root):
+    # Fallback for read-only dataset mounts
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    digest = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()
+    return os.path.join(cache_home, "firespread", f"fire_index_{digest}.json")
+
+
+def scan_fires(root, years=None, cached=None):
+    """
+    Dates available for every fire of a WildfireSpreadTS tree
+    (<root>/<year>/fire_<id>/<YYYY-MM-DD>.tif).
+
+    Fire folders whose modification time matches the cached entry are not
+    listed again, so rescanning a large tree only stats the folders.
+
+    Args:
+        root: WildfireSpreadTS root folder
+        years: Years to include (all numeric year folders if None)
+        cached: Previous result of scan_fires, reused for unchanged fires
+
+    Returns:
+        dict '<year>/fire_<id>' -> {'mtime_ns', 'dates' (sorted ISO strings)}
+    """
+    cached = {} if cached is None else cached
+    years = None if years is None else {str(year) for year in years}
+    fires = {}
+    for year in sorted(os.scandir(root), key=lambda entry: entry.name):
+        if not (year.is_dir() and year.name.isdigit()):
+            continue
+        if years is not None and year.name not in years:
+            continue
+        for fire in sorted(os.scandir(year.path), key=lambda entry: entry.name):
+            if not (fire.is_dir() and fire.name.startswith('fire_')):
+                continue
+            key = f"{year.name}/{fire.name}"
+            mtime = fire.stat().st_mtime_ns
+            if key in cached and cached[key]["mtime_ns"] == mtime:
+                fires[key] = cached[key]
+                continue
+            dates = sorted(str(date) for date in
+                           (_parse_date(f) for f in os.listdir(fire.path) if f.endswith('.tif'))
+                           if date is not None)
+            fires[key] = {"mtime_ns": mtime, "dates": dates}
+    return fires
+
+
+class MultiFireDataset(FireSpreadDataset):
+    """
+    Sliding windows over every fire of a WildfireSpreadTS tree.
+
+    The tree is scanned once and the dates of every fire (all years) are
+    cached to a JSON index, so datasets over different years share it; later
+    runs reuse it and only list fire folders that changed. The index is
+    written to <root>/.fire_index.json, or to
+    ~/.cache/firespread/ ($XDG_CACHE_HOME) when the root is read-only.
+    Windows never cross fire boundaries or gaps between dates, and
+    `window_fires` gives the fire of each window for balanced sampling
+    (see FireWindowSampler). Frames are decoded as in FireSpreadDataset,
+    including the optional shared FrameCache.
+    """
+
+    def __init__(self, root, seq_len=4, channels=None, normalization=True,
+                 resize_to=(256, 256), resampling="bilinear", cache=None, years=None,
+                 index_path=None, validate=True):
+        """
+        root: WildfireSpreadTS root with <year>/fire_<id>/<date>.tif files
+        years: years to include (all if None)
+        index_path: JSON index file (<root>/.fire_index.json, falling back to
+                    the user cache directory, if None)
+        validate: rescan changed fire folders when loading the index; with
+                  False the cached index is trusted without touching the tree
+        Other arguments as for FireSpreadDataset
+        """
+        self.years = None if years is None else sorted(str(year) for year in years)
+        self.index_paths = ([os.path.join(root, '.fire_index.json'), _user_index_path(root)]
+                            if index_path is None else [index_path])
+        self.index_path = self.index_paths[0]
+        self.validate = validate
+        super().__init__(root, seq_len=seq_len, channels=channels,
+                         normalization=normalization, resize_to=resize_to,
+                         resampling=resampling, cache=cache)
+
+    def _read_index(self):
+        # Most recently written index among the candidate paths
+        existing = [path for path in self.index_paths if os.path.exists(path)]
+        for path in sorted(existing, key=os.path.getmtime, reverse=True):
+            try:
+                with open(path) as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if index.get("version") == INDEX_VERSION:
+                self.index_path = path
+                return index["fires"]
+        return None
+
+    def _write_index(self, fires):
+        for path in self.index_paths:
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                with open(tmp, 'w') as f:
+                    json.dump({"version": INDEX_VERSION, "fires": fires}, f)
+                os.replace(tmp, path)
+            except OSError:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                continue
+            self.index_path = path
+            return
+        print(f"[DATA] Could not write the fire index to {', '.join(self.index_paths)}")
+
+    def _load_fires(self):
+        fires = cached = self._read_index()
+        if cached is None or self.validate:
+            fires = scan_fires(self.data_folder, cached=cached)
+            if fires != cached:
+                self._write_index(fires)
+        if self.years is None:
+            return fires
+        return {key: fire for key, fire in fires.items() if key.split('/')[0] in self.years}
+
+    def _index(self):
+        self.fires = sorted(self._load_fires().items())
+        files, windows, window_fires = [], [], []
+        for fire_id, (key, fire) in enumerate(self.fires):
+            folder = os.path.join(self.data_folder, key)
+            dates = [datetime.date.fromisoformat(date) for date in fire["dates"]]
+            paths = [os.path.join(folder, f"{date}.tif") for date in fire["dates"]]
+            files.extend(paths)
+
+            # Runs of consecutive days, windows only inside a run
+            start = 0
+            for i in range(1, len(dates) + 1):
+                if i == len(dates) or (dates[i] - dates[i - 1]).days != 1:
+                    for s in range(start, i - self.seq_len + 1):
+                        windows.append(paths[s:s + self.seq_len])
+                        window_fires.append(fire_id)
+                    start = i
+
+        self.window_fires = np.array(window_fires, dtype=np.int64)
+        print(f"[DATA] {len(self.fires)} fires, {len(files)} frames, {len(windows)} windows")
+        return files, windows
+
+
+class FireWindowSampler(Sampler):
+    """
+    Window sampler with balanced or weighted sampling, sharded across processes.
+
+    'uniform' draws every window with the same probability, 'balanced' gives
+    every fire the same total probability (long fires no longer dominate),
+    and explicit per-window weights can be passed instead. Every process
+    draws the same sequence for a given seed and epoch and keeps the indices
+    of its rank, as DistributedSampler does; DataLoader workers then split
+    each process's batches as usual.
+    """
+
+    def __init__(self, dataset, mode="balanced", weights=None, num_samples=None,
+                 num_replicas=1, rank=0, seed=0, replacement=True):
+        """
+        dataset: MultiFireDataset (or any dataset with window_fires for 'balanced')
+        mode: 'uniform' or 'balanced' (ignored when weights are given)
+        weights: optional per-window sampling weights
+        num_samples: samples per replica and epoch (len(dataset) / num_replicas if None)
+        num_replicas, rank: number of processes and the index of this one
+        seed: base seed, combined with the epoch (see set_epoch)
+        replacement: draw with replacement
+        """
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+        elif mode == "uniform":
+            weights = np.ones(len(dataset))
+        elif mode == "balanced":
+            counts = np.bincount(dataset.window_fires)
+            weights = 1.0 / counts[dataset.window_fires]
+        else:
+            raise ValueError(f"Unsupported mode: {mode}. Use 'uniform' or 'balanced'")
+        if len(weights) != len(dataset):
+            raise ValueError(f"Expected {len(dataset)} weights, got {len(weights)}")
+        if not 0 <= rank < num_replicas:
+            raise ValueError(f"rank {rank} out of range for {num_replicas} replicas")
+
+        self.weights = torch.as_tensor(weights, dtype=torch.float64)
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.seed = seed
+        self.replacement = replacement
+        self.epoch = 0
+        self.num_samples = (math.ceil(len(dataset) / num_replicas) if num_samples is None
+                            else num_samples)
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def __len__(self):
+        return self.num_samples
+
+    def __iter__(self):
+        generator = torch.Generator()
+        generator.manual_seed(self.seed + self.epoch)
+        total = self.num_samples * self.num_replicas
+        if self.replacement:
+            indices = torch.multinomial(self.weights, total, replacement=True,
+                                        generator=generator)
+        else:
+            # Weighted order without replacement, repeated to fill every replica
+            order = torch.multinomial(self.weights, int((self.weights > 0).sum()),
+                                      replacement=False, generator=generator)
+            indices = order.repeat(math.ceil(total / len(order)))[:total]
+        return iter(indices[self.rank:total:self.num_replicas].tolist())
@@ -3,29 +3,79 @@ import torch
 import rasterio
 import numpy as np
 import torch.nn.functional as F
+from rasterio.enums import Resampling
 from torch.utils.data import Dataset
 
+
+def soft_normalize(img):
+    """Per-image min-max normalization (unchanged when the image is constant)."""
+    mx, mn = img.max(), img.min()
+    if mx > mn:
+        return (img - mn) / (mx - mn)
+    return img
+
+
+def read_frame(path, channels=None, resize_to=(256, 256), resampling="bilinear"):
+    """
+    Read only the requested bands as a (C, H, W) float32 array with NaN
+    replaced by 0, resized to resize_to.
+
+    'bilinear' zeroes NaN at full resolution and then interpolates with torch,
+    exactly as the original preprocessing and ml/results/grid_transformation.py
+    do. Any other rasterio method ('nearest', 'average', ...) resamples while
+    reading instead, which avoids decoding the full-resolution bands (and uses
+    overviews when available) but gives different frames; interpolating
+    methods then also spread the fire band's NaN no-data before it is zeroed.
+    """
+    with rasterio.open(path) as src:
+        indexes = (list(range(1, src.count + 1)) if channels is None
+                   else [c + 1 for c in channels])
+        if resampling == "bilinear" or resize_to is None:
+            img = src.read(indexes, out_dtype=np.float32)
+        else:
+            img = src.read(indexes, out_shape=(len(indexes), *resize_to),
+                           resampling=Resampling[resampling], out_dtype=np.float32)
+    img = np.nan_to_num(img, nan=0.0, copy=False)
+    if resampling == "bilinear" and resize_to is not None:
+        t = F.interpolate(torch.from_numpy(img).unsqueeze(0), size=tuple(resize_to),
+                          mode='bilinear', align_corners=False)
+        img = t.squeeze(0).numpy()
+    return img
+
+
 class FireSpreadDataset(Dataset):
     def __init__(self, data_folder, seq_len=4, channels=None, normalization=True,
-                 resize_to=(256, 256)):
+                 resize_to=(256, 256), resampling="bilinear", cache=None):
         """
         data_folder: single folder containing .tif files
         seq_len: temporal window length
-        channels: list of band indices to use (e.g., [23])
+        channels: list of 0-based band indices to use (e.g., [22] for band 23)
         normalization: per-image min-max if True
         resize_to: (H, W) to enforce equal sizes across samples
+        resampling: 'bilinear' (the original preprocessing, as used at
+                    inference) or another rasterio method to resample while
+                    reading (see read_frame)
+        cache: optional FrameCache shared by the DataLoader workers, so each
+               daily frame is decoded once instead of once per window
         """
         self.data_folder = data_folder
         self.seq_len = seq_len
         self.channels = channels
         self.normalization = normalization
         self.resize_to = resize_to
+        self.resampling = Resampling[resampling]
+        self.cache = cache
+
+        self.files, self.windows = self._index()
 
-        self.files = sorted([os.path.join(data_folder, f)
-                             for f in os.listdir(data_folder) if f.endswith('.tif')])
+    def _index(self):
+        """Frame paths and the windows (lists of seq_len paths) over them."""
+        files = sorted([os.path.join(self.data_folder, f)
+                        for f in os.listdir(self.data_folder) if f.endswith('.tif')])
 
-        self.windows = [self.files[i:i+self.seq_len]
-                        for i in range(len(self.files) - self.seq_len + 1)]
+        windows = [files[i:i+self.seq_len]
+                   for i in range(len(files) - self.seq_len + 1)]
+        return files, windows
 
     def __len__(self):
         return len(self.windows)
@@ -33,34 +83,20 @@ class FireSpreadDataset(Dataset):
     def _soft_normalize(self, img):
         if not self.normalization:
             return img
-        mx, mn = img.max(), img.min()
-        if mx > mn:
-            return (img - mn) / (mx - mn)
-        return img
+        return soft_normalize(img)
 
-    def _resize_numpy(self, arr, size_hw):
-        if size_hw is None:
-            return arr
-        Ht, Wt = size_hw
-        t = torch.from_numpy(arr).unsqueeze(0)  # (1,C,H,W)
-        t = F.interpolate(t, size=(Ht, Wt), mode='bilinear', align_corners=False)
-        return t.squeeze(0).numpy()
+    def _read_frame(self, path):
+        img = read_frame(path, self.channels, self.resize_to, self.resampling.name)
+        return self._soft_normalize(img)
 
-    def __getitem__(self, idx):
-        seq_paths = self.windows[idx]
-        seq = []
-        for p in seq_paths:
-            with rasterio.open(p) as src:
-                img = src.read().astype(np.float32) 
-
-            img = np.nan_to_num(img, nan=0.0)
-
-            if self.channels is not None:
-                img = img[self.channels, :, :]      
+    def _frame(self, path):
+        if self.cache is None:
+            return self._read_frame(path)
+        return self.cache.get_or_load(path, self._read_frame, channels=self.channels,
+                                      resize_to=self.resize_to,
+                                      normalization=self.normalization,
+                                      resampling=self.resampling.name)
 
-            img = self._resize_numpy(img, self.resize_to)  
-            img = self._soft_normalize(img)
-
-            seq.append(img)
-
-        return torch.tensor(np.stack(seq), dtype=torch.float32)  
+    def __getitem__(self, idx):
+        seq = [self._frame(p) for p in self.windows[idx]]
+        return torch.from_numpy(np.stack(seq))
@@ -0,0 +1,221 @@
+import os
+import json
+import hashlib
+import argparse
+import torch
+import numpy as np
+from torch.utils.data import Dataset
+
+from ml.data.split_data import read_frame, soft_normalize
+
+MANIFEST = "manifest.json"
+CUBE = "frames.bin"
+STORE_VERSION = 1
+
+
+def _file_hash(path, block_size=1 << 20):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def load_manifest(store_dir):
+    """Manifest of a tensor store, or None if the store does not exist."""
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(store_dir, manifest):
+    path = os.path.join(store_dir, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
+
+
+def build_tensor_store(data_folder, store_dir, channels=None, resize_to=(256, 256),
+                       normalization=True, resampling="bilinear", dtype="float32"):
+    """
+    Preprocess a folder of daily GeoTIFFs into a memory-mapped frame cube.
+
+    Every frame is decoded once (band subset, NaN cleanup, resampling and
+    normalization as in FireSpreadDataset) and written to a raw
+    (num_frames, C, H, W) cube in date order, next to a manifest recording
+    the settings and, per frame, the source file with its SHA-1 hash, size
+    and modification time.
+
+    Rebuilding is incremental: sources whose size and modification time (or
+    failing that, hash) are unchanged are not decoded again. New files after
+    the last date are appended in place; an insertion or change earlier in
+    the sequence rewrites the cube, copying the unchanged frames. Changing
+    any setting rebuilds everything.
+
+    Args:
+        data_folder: Folder with .tif files (e.g. ml/data/sample_data)
+        store_dir: Output directory
+        channels: 0-based band indices (all bands if None)
+        resize_to: (H, W) of the frames; required so all frames share a shape
+        normalization: Per-frame min-max normalization
+        resampling: Resampling method (see read_frame)
+        dtype: 'float32' or 'float16'
+
+    Returns:
+        The manifest dict
+    """
+    if dtype not in ["float32", "float16"]:
+        raise ValueError(f"Unsupported dtype: {dtype}. Use 'float32' or 'float16'")
+    if resize_to is None:
+        raise ValueError("resize_to is required so every frame has the same shape")
+    os.makedirs(store_dir, exist_ok=True)
+
+    settings = {
+        "version": STORE_VERSION,
+        "bands": None if channels is None else [int(c) for c in channels],
+        "resize_to": [int(s) for s in resize_to],
+        "normalization": bool(normalization),
+        "resampling": resampling,
+        "dtype": dtype,
+    }
+    old = load_manifest(store_dir)
+    if old is not None and any(old.get(key) != value for key, value in settings.items()):
+        print("[STORE] Settings changed, rebuilding all frames")
+        old = None
+    old_frames = [] if old is None else old["frames"]
+    old_by_name = {frame["file"]: (i, frame) for i, frame in enumerate(old_frames)}
+
+    names = sorted(f for f in os.listdir(data_folder) if f.endswith('.tif'))
+    frames, reused = [], []
+    for name in names:
+        path = os.path.join(data_folder, name)
+        stat = os.stat(path)
+        entry = {"file": name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        index, previous = old_by_name.get(name, (None, None))
+        if previous is not None and (previous["size"], previous["mtime_ns"]) == \
+                (entry["size"], entry["mtime_ns"]):
+            entry["sha1"] = previous["sha1"]
+        else:
+            entry["sha1"] = _file_hash(path)
+        frames.append(entry)
+        reused.append(index if previous is not None and previous["sha1"] == entry["sha1"]
+                      else None)
+
+    # An empty old store has no band count; probe the first file instead
+    num_bands = old["shape"][1] if old is not None and old_frames else None
+    if num_bands is None and names:
+        num_bands = read_frame(os.path.join(data_folder, names[0]), channels,
+                               resize_to, resampling).shape[0]
+    shape = [len(frames), num_bands or 0, *settings["resize_to"]]
+    frame_shape = tuple(shape[1:])
+    cube_path = os.path.join(store_dir, CUBE)
+
+    def decode(name):
+        img = read_frame(os.path.join(data_folder, name), channels, resize_to, resampling)
+        return soft_normalize(img) if normalization else img
+
+    # Unchanged prefix of the old cube: only the new frames need writing
+    prefix = 0
+    while prefix < len(frames) and reused[prefix] == prefix:
+        prefix += 1
+    appendable = old is not None and prefix == len(old_frames)
+    if appendable:
+        cube = np.memmap(cube_path, dtype=dtype, mode="r+", shape=tuple(shape)) \
+            if len(frames) > prefix else None
+        if cube is not None:
+            # memmap grows the file to the new shape
+            for i in range(prefix, len(frames)):
+                cube[i] = decode(frames[i]["file"])
+            cube.flush()
+            del cube
+    else:
+        old_cube = None
+        if old is not None and any(index is not None for index in reused):
+            old_cube = np.memmap(cube_path, dtype=dtype, mode="r",
+                                 shape=tuple(old["shape"]))
+        tmp_path = cube_path + ".tmp"
+        if frames:
+            cube = np.memmap(tmp_path, dtype=dtype, mode="w+", shape=tuple(shape))
+            for i, frame in enumerate(frames):
+                cube[i] = (old_cube[reused[i]] if reused[i] is not None
+                           else decode(frame["file"]))
+            cube.flush()
+            del cube
+        else:
+            open(tmp_path, "wb").close()
+        del old_cube
+        os.replace(tmp_path, cube_path)
+
+    decoded = sum(index is None for index in reused) if not appendable else len(frames) - prefix
+    print(f"[STORE] {len(frames)} frames of shape {frame_shape} in {store_dir} "
+          f"({decoded} decoded, {len(frames) - decoded} reused)")
+    manifest = dict(settings, source=os.path.abspath(data_folder), shape=shape, frames=frames)
+    _write_manifest(store_dir, manifest)
+    return manifest
+
+
+class TensorStoreDataset(Dataset):
+    """
+    Sliding windows over a tensor store built by build_tensor_store.
+
+    The cube is memory-mapped copy-on-write, so each window is a zero-copy
+    torch view of the mapped file (pages are read on first access and shared
+    through the page cache by all DataLoader workers). Frames are returned in
+    the stored dtype; convert float16 stores with .float() in the training loop.
+    """
+
+    def __init__(self, store_dir, seq_len=4):
+        """
+        store_dir: directory written by build_tensor_store
+        seq_len: temporal window length
+        """
+        self.store_dir = store_dir
+        self.seq_len = seq_len
+        self.manifest = load_manifest(store_dir)
+        if self.manifest is None:
+            raise ValueError(f"No tensor store in {store_dir}. Run build_tensor_store first")
+        self.files = [frame["file"] for frame in self.manifest["frames"]]
+        self._cube = None
+
+    @property
+    def cube(self):
+        # Mapped lazily so the dataset pickles cheaply into DataLoader workers
+        if self._cube is None:
+            self._cube = np.memmap(os.path.join(self.store_dir, CUBE),
+                                   dtype=self.manifest["dtype"], mode="c",
+                                   shape=tuple(self.manifest["shape"]))
+        return self._cube
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cube"] = None
+        return state
+
+    def __len__(self):
+        return max(len(self.files) - self.seq_len + 1, 0)
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return torch.from_numpy(self.cube[idx:idx + self.seq_len])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocess GeoTIFF frames into a tensor store")
+    parser.add_argument("data_folder")
+    parser.add_argument("store_dir")
+    parser.add_argument("--channels", type=int, nargs="+", default=None)
+    parser.add_argument("--resize", type=int, nargs=2, default=[256, 256])
+    parser.add_argument("--no-normalization", action="store_true")
+    parser.add_argument("--resampling", default="bilinear")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    args = parser.parse_args()
+
+    build_tensor_store(args.data_folder, args.store_dir, channels=args.channels,
+                       resize_to=args.resize, normalization=not args.no_normalization,
+                       resampling=args.resampling, dtype=args.dtype)